@@ -0,0 +1,228 @@
+# ==============================================================================
+# Pre-baked image pack: every sprite and animation frame in one file as raw
+# display-format pixels, animation frames already trimmed, so startup maps them
+# instead of decoding PNGs.
+# Bake with: python -m src.asset_pack [--output FILE]
+# ==============================================================================
+
+import argparse
+import io
+import json
+import mmap
+import os
+import struct
+import sys
+from os.path import join
+from time import perf_counter
+import pygame
+from .settings import (
+    STAR_IMAGE_PATH, METEOR_IMAGE_PATH, LASER_IMAGE_PATH, PLAYER_IMAGE_PATH, MUTE_IMAGE_PATH,
+    EXPLOSION_FRAMES_PATH, CONFETTI_FRAMES_PATH, EXPLOSION_FRAME_COUNT, CONFETTI_FRAME_COUNT,
+    ASSET_PACK_PATH, ASSET_PACK_RAW_LIMIT
+)
+from .trimmed_frames import TrimmedFrame, trim
+
+PACK_MAGIC = b"SSPK"
+PACK_VERSION = 2
+HEADER = struct.Struct("<4sII") # magic, version, index length
+ALIGNMENT = 16
+TRIMMED_PREFIXES = ("explosion/", "confetti/") # Animation frames, stored cropped to their visible pixels
+
+# Byte order of a 32-bit pixel in memory, keyed by its (R, G, B, A) masks
+_FORMATS = {
+    (0xFF0000, 0xFF00, 0xFF, 0xFF000000): "BGRA",
+    (0xFF, 0xFF00, 0xFF0000, 0xFF000000): "RGBA",
+    (0xFF00, 0xFF0000, 0xFF000000, 0xFF): "ARGB",
+}
+if sys.byteorder == "big":
+    _FORMATS = {
+        (0xFF0000, 0xFF00, 0xFF, 0xFF000000): "ARGB",
+        (0xFF000000, 0xFF0000, 0xFF00, 0xFF): "RGBA",
+    }
+
+def image_sources():
+    """Returns (name, path) for every image the game loads."""
+    sources = [
+        ("star", STAR_IMAGE_PATH),
+        ("meteor", METEOR_IMAGE_PATH),
+        ("laser", LASER_IMAGE_PATH),
+        ("player", PLAYER_IMAGE_PATH),
+        ("mute", MUTE_IMAGE_PATH),
+    ]
+    sources += [(f"explosion/{i}", join(EXPLOSION_FRAMES_PATH, f"{i}.png")) for i in range(EXPLOSION_FRAME_COUNT)]
+    sources += [(f"confetti/{i}", join(CONFETTI_FRAMES_PATH, f"{i}.png")) for i in range(CONFETTI_FRAME_COUNT)]
+    return sources
+
+def load_images(names=None):
+    """Decodes images from their PNG files and converts them to the display format. Loads all by default."""
+    return {name: pygame.image.load(path).convert_alpha()
+            for name, path in image_sources() if names is None or name in names}
+
+def _display_format():
+    """Returns the pixel byte order convert_alpha produces, or None if the pack can't hold it."""
+    masks = pygame.Surface((1, 1), pygame.SRCALPHA).convert_alpha().get_masks()
+    return _FORMATS.get(tuple(masks))
+
+def _stamp(path):
+    """Size and modification time, enough to notice a source image has changed."""
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+def bake(path=ASSET_PACK_PATH):
+    """Writes every image into one pack file. The display mode must already be set."""
+    pixel_format = _display_format()
+    if pixel_format is None:
+        raise RuntimeError("The display pixel format can't be stored in an asset pack.")
+
+    frames = []
+    blobs = []
+    offset = 0
+    for name, source in image_sources():
+        surface = pygame.image.load(source).convert_alpha()
+        frame = {"name": name, "source": source, "stamp": _stamp(source), "encoding": "raw"}
+        trimmed = name.startswith(TRIMMED_PREFIXES)
+        if trimmed:
+            # Loads as a TrimmedFrame, with where the crop sits on the original canvas
+            cropped = trim(surface)
+            surface = cropped.image
+            frame["crop"] = list(cropped.offset)
+            frame["canvas"] = list(cropped.size)
+        if not trimmed and surface.get_width() * surface.get_height() * 4 > ASSET_PACK_RAW_LIMIT:
+            # Big untrimmed images would take megabytes each as raw pixels, so keep the PNG
+            frame["encoding"] = "png"
+            with open(source, "rb") as file:
+                data = file.read()
+        else:
+            data = pygame.image.tobytes(surface, pixel_format)
+        frame.update(size=surface.get_size(), offset=offset, length=len(data))
+        frames.append(frame)
+        blobs.append(data)
+        offset += len(data)
+        padding = -offset % ALIGNMENT
+        blobs.append(b"\0" * padding)
+        offset += padding
+
+    index = json.dumps({"format": pixel_format, "frames": frames}).encode("utf-8")
+    data_start = HEADER.size + len(index)
+    data_start += -data_start % ALIGNMENT
+
+    # Write next to the target and swap it in, so a crash never leaves half a pack behind
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(HEADER.pack(PACK_MAGIC, PACK_VERSION, len(index)))
+        file.write(index)
+        file.write(b"\0" * (data_start - HEADER.size - len(index)))
+        for blob in blobs:
+            file.write(blob)
+    os.replace(temp_path, path)
+    return frames, data_start + offset
+
+def _read_index(mapped):
+    """Parses the header and frame index, returning None if the file isn't a usable pack."""
+    if len(mapped) < HEADER.size:
+        return None, 0
+    magic, version, index_length = HEADER.unpack_from(mapped)
+    if magic != PACK_MAGIC or version != PACK_VERSION:
+        return None, 0
+    index_end = HEADER.size + index_length
+    data_start = index_end + (-index_end % ALIGNMENT)
+    return json.loads(bytes(mapped[HEADER.size:index_end])), data_start
+
+def load(path=ASSET_PACK_PATH, names=None):
+    """Maps the pack and builds a surface for each image in names, or for every image.
+    Animation frames come back as TrimmedFrames.
+
+    Returns None when the pack is missing, was baked for another display format,
+    or any source image has changed since it was baked.
+    """
+    try:
+        with open(path, "rb") as file:
+            # A private copy-on-write mapping: pages load lazily and the surfaces stay writable
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+    except (OSError, ValueError):
+        return None
+
+    index, data_start = _read_index(mapped)
+    if index is None or index["format"] != _display_format():
+        print("Asset pack is out of date, loading PNG files instead.")
+        return None
+
+    frames = {frame["name"]: frame for frame in index["frames"]}
+    try:
+        stale = any(frames[name]["stamp"] != _stamp(source) for name, source in image_sources())
+    except (KeyError, OSError):
+        stale = True
+    if stale:
+        print("Asset pack is out of date, loading PNG files instead.")
+        return None
+
+    # The surfaces share the mapped pixels, and each view keeps the mapping alive
+    view = memoryview(mapped)
+    images = {}
+    for name, frame in frames.items():
+        if names is not None and name not in names:
+            continue
+        start = data_start + frame["offset"]
+        data = view[start:start + frame["length"]]
+        if frame["encoding"] == "raw":
+            image = pygame.image.frombuffer(data, frame["size"], index["format"])
+        else:
+            image = pygame.image.load(io.BytesIO(data), frame["source"]).convert_alpha()
+        if "crop" in frame:
+            image = TrimmedFrame(image, tuple(frame["crop"]), tuple(frame["canvas"]))
+        images[name] = image
+    return images
+
+def _time_load(loader, repeat):
+    """Best wall time of several loads, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        images = loader()
+        best = min(best, perf_counter() - start)
+        if images is None:
+            return None
+    return best * 1000
+
+def _draw_all(images, target):
+    """Draws every image once, which makes the mapped pages of raw ones load from disk."""
+    for image in images.values():
+        target.blit(image.image if isinstance(image, TrimmedFrame) else image, (0, 0))
+    return images
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bake all game images into one pack file.")
+    parser.add_argument("--output", default=ASSET_PACK_PATH, help="pack file to write")
+    parser.add_argument("--repeat", type=int, default=5, help="loads to time for the startup report")
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    pygame.display.set_mode((1, 1), pygame.HIDDEN)
+
+    frames, size = bake(args.output)
+    print(f"Baked {len(frames)} images into {args.output} ({size / 1024:.0f} KiB).")
+
+    # Raw images skip decoding entirely; PNG-encoded ones only save the file opens. The PNG path trims
+    # animation frames after decoding, as the game does, and a first draw counts reading the mapped pages.
+    target = pygame.Surface((1920, 1080), pygame.SRCALPHA)
+    def load_png(names):
+        return {name: trim(surf) if name.startswith(TRIMMED_PREFIXES) else surf
+                for name, surf in load_images(names).items()}
+    groups = (("raw", lambda frame: frame["encoding"] == "raw" and "crop" not in frame),
+              ("trimmed raw", lambda frame: "crop" in frame),
+              ("png", lambda frame: frame["encoding"] == "png"))
+    for label, selected in groups:
+        names = {frame["name"] for frame in frames if selected(frame)}
+        if not names:
+            continue
+        png_ms = _time_load(lambda: load_png(names), args.repeat)
+        pack_ms = _time_load(lambda: load(args.output, names), args.repeat)
+        png_draw_ms = _time_load(lambda: _draw_all(load_png(names), target), args.repeat)
+        pack_draw_ms = _time_load(lambda: _draw_all(load(args.output, names), target), args.repeat)
+        print(f"{len(names)} {label} images: PNG files {png_ms:.1f} ms, pack {pack_ms:.1f} ms; "
+              f"with a first draw {png_draw_ms:.1f} ms and {pack_draw_ms:.1f} ms.")
+    pygame.quit()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
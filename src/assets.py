@@ -3,12 +3,28 @@
 # ==============================================================================
 
 import pygame
-from os.path import join
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
 from .settings import (
-    STAR_IMAGE_PATH, METEOR_IMAGE_PATH, LASER_IMAGE_PATH, PLAYER_IMAGE_PATH,
-    MUTE_IMAGE_PATH, EXPLOSION_FRAMES_PATH, CONFETTI_FRAMES_PATH,
-    FONT_LARGE_PATH, FONT_LARGE_SIZE, FONT_SMALL_PATH, FONT_SMALL_SIZE
+    EXPLOSION_FRAME_COUNT, CONFETTI_FRAME_COUNT, LOADER_WORKERS,
+    FONT_LARGE_PATH, FONT_LARGE_SIZE, FONT_SMALL_PATH, FONT_SMALL_SIZE, FONT_DEBUG_PATH, FONT_DEBUG_SIZE, METEOR_SCALES,
+    EXPLOSION_SCALES, PREMULTIPLIED_ALPHA
 )
+from .rotation_atlas import RotationAtlas
+from .trimmed_frames import trim, scale
+from . import asset_pack
+
+def _load_images(names):
+    """Loads the named images from the asset pack, or from the PNG files if there is no usable pack."""
+    images = asset_pack.load(names=names)
+    if images is None:
+        images = asset_pack.load_images(names)
+    return images
+
+def _load_trimmed_frames(names):
+    """Loads animation frames and crops them on the loader thread. Sparse ones get RLE acceleration,
+    so these must be drawn without blend flags."""
+    return {name: trim(surf, rle=True) for name, surf in _load_images(names).items()}
 
 class Assets:
     _instance = None
@@ -24,47 +40,154 @@ class Assets:
             cls._instance.laser_surf = None
             cls._instance.player_surf = None
             cls._instance.mute_surf = None
+            cls._instance.meteor_rotations = None
 
             cls._instance.explosion_frames = []
-            cls._instance.confetti_frames = []
+            cls._instance._confetti_frames = []
+            cls._instance.scaled_explosion_frames = {}
+
+            # Blend flags for drawing gameplay sprites, set when they are premultiplied
+            cls._instance.premultiplied = False
+            cls._instance.sprite_blend_flags = 0
+
+            # Number of explosion frames built by the lazy cache after loading
+            cls._instance._explosion_allocations = 0
 
             cls._instance.font_large = None
             cls._instance.font_small = None
+            cls._instance.font_debug = None
+
+            # Images still being decoded by start_loading
+            cls._instance._image_futures = []
+            cls._instance._confetti_futures = []
+            cls._instance._load_start = 0.0
         return cls._instance
 
-    def init(self):
-        """Loads all assets into memory. This method should only be called once."""
+    def init(self, deferred=True):
+        """Loads all assets into memory. This method should only be called once.
+        The confetti frames keep loading in the background until they are first used,
+        headless tools that never show them can skip them with deferred=False."""
         if self.initialized:
             return
 
+        executor = ThreadPoolExecutor(LOADER_WORKERS, thread_name_prefix="assets")
+        self.start_loading(executor, deferred)
+        self.finish_loading()
+        executor.shutdown(wait=False)
+
+    def start_loading(self, executor, deferred=True):
+        """Loads the fonts, then starts decoding images on the executor's threads.
+        The deferred confetti frames are skipped entirely when deferred is False.
+        Returns the futures that must finish before finish_loading can run without waiting."""
+        if self.initialized:
+            return []
+
         print("Loading assets...")
+        self._load_start = perf_counter()
+
+        # Fonts load right away so a loading screen can draw text
+        self.font_large = pygame.font.Font(FONT_LARGE_PATH, FONT_LARGE_SIZE)
+        self.font_small = pygame.font.Font(FONT_SMALL_PATH, FONT_SMALL_SIZE)
+        self.font_debug = pygame.font.Font(FONT_DEBUG_PATH, FONT_DEBUG_SIZE)
+
+        # Both sets are split across the workers so they decode in parallel and report progress per chunk.
+        # Confetti is only shown after a new high score, so it's deferred.
+        names = [name for name, _ in asset_pack.image_sources()]
+        confetti = [name for name in names if name.startswith("confetti/")]
+        needed = [name for name in names if name not in confetti]
+        self._image_futures = [executor.submit(_load_images, needed[i::LOADER_WORKERS]) for i in range(LOADER_WORKERS)]
+        self._confetti_futures = [
+            executor.submit(_load_trimmed_frames, confetti[i::LOADER_WORKERS]) for i in range(LOADER_WORKERS)
+        ] if deferred else []
+        return list(self._image_futures)
+
+    def finish_loading(self):
+        """Waits for the needed images and builds everything derived from them."""
         try:
-            # Load images
-            self.star_surf = pygame.image.load(STAR_IMAGE_PATH).convert_alpha()
-            self.meteor_surf = pygame.image.load(METEOR_IMAGE_PATH).convert_alpha()
-            self.laser_surf = pygame.image.load(LASER_IMAGE_PATH).convert_alpha()
-            self.player_surf = pygame.image.load(PLAYER_IMAGE_PATH).convert_alpha()
-            self.mute_surf = pygame.image.load(MUTE_IMAGE_PATH).convert_alpha()
-
-            # Load animation frames
-            self.explosion_frames = [
-                pygame.image.load(join(EXPLOSION_FRAMES_PATH, f"{i}.png")).convert_alpha()
-                for i in range(21)
-            ]
-            self.confetti_frames = [
-                pygame.image.load(join(CONFETTI_FRAMES_PATH, f"{i}.png")).convert_alpha()
-                for i in range(59)
-            ]
-
-            # Load fonts
-            self.font_large = pygame.font.Font(FONT_LARGE_PATH, FONT_LARGE_SIZE)
-            self.font_small = pygame.font.Font(FONT_SMALL_PATH, FONT_SMALL_SIZE)
+            images = {}
+            for future in self._image_futures:
+                images.update(future.result())
+            self._image_futures = []
+
+            self.star_surf = images["star"]
+            self.meteor_surf = images["meteor"]
+            self.laser_surf = images["laser"]
+            self.player_surf = images["player"]
+            self.mute_surf = images["mute"]
+
+            # Animation frames, cropped to their visible pixels
+            self.explosion_frames = [trim(images[f"explosion/{i}"]) for i in range(EXPLOSION_FRAME_COUNT)]
+
+            # Premultiplied sprites blend faster, but must always be drawn with BLEND_PREMULTIPLIED
+            if PREMULTIPLIED_ALPHA:
+                self._premultiply_sprites()
+
+            # Rotated meteor images are built on demand and shared by every meteor
+            self.meteor_rotations = RotationAtlas(self.meteor_surf, METEOR_SCALES)
 
             self.initialized = True
-            print("Assets loaded successfully.")
+            print(f"Assets loaded successfully in {(perf_counter() - self._load_start) * 1000:.0f} ms.")
         except pygame.error as e:
             print(f"Error loading assets: {e}")
             self.initialized = False
 
+    @property
+    def confetti_frames(self):
+        """The trimmed confetti animation frames, waiting for their background load on first use."""
+        if self._confetti_futures:
+            images = {}
+            for future in self._confetti_futures:
+                images.update(future.result())
+            self._confetti_futures = []
+            self._confetti_frames = [images[f"confetti/{i}"] for i in range(CONFETTI_FRAME_COUNT)]
+        return self._confetti_frames
+
+    def _premultiply_sprites(self):
+        """Converts the gameplay sprite images to premultiplied alpha."""
+        self.meteor_surf = self.meteor_surf.premul_alpha()
+        self.laser_surf = self.laser_surf.premul_alpha()
+        self.player_surf = self.player_surf.premul_alpha()
+        self.explosion_frames = [frame._replace(image=frame.image.premul_alpha()) for frame in self.explosion_frames]
+        self.premultiplied = True
+        self.sprite_blend_flags = pygame.BLEND_PREMULTIPLIED
+
+    @property
+    def surface_allocations(self):
+        """Number of surfaces built by the lazy caches after loading, explosion frames and meteor rotations."""
+        rotations = self.meteor_rotations.misses if self.meteor_rotations is not None else 0
+        return self._explosion_allocations + rotations
+
+    def get_explosion_frames(self, size, step=1):
+        """Returns the explosion frames scaled for the given size, building them on first use.
+        With a step, only every step-th frame is returned."""
+        if size not in EXPLOSION_SCALES:
+            size = "normal"
+        frames = self.scaled_explosion_frames.get(size)
+        if frames is None:
+            frames = [scale(frame, EXPLOSION_SCALES[size]) for frame in self.explosion_frames]
+            self._explosion_allocations += len(frames)
+            self.scaled_explosion_frames[size] = frames
+        if step == 1:
+            return frames
+
+        # The reduced sets share the full set's surfaces
+        key = (size, step)
+        reduced = self.scaled_explosion_frames.get(key)
+        if reduced is None:
+            reduced = self.scaled_explosion_frames[key] = frames[::step]
+        return reduced
+
+    def explosion_frames_key(self, frames):
+        """Returns the (size, step) get_explosion_frames was called with to get these frames."""
+        for key, cached in self.scaled_explosion_frames.items():
+            if cached is frames:
+                return key if isinstance(key, tuple) else (key, 1)
+        raise KeyError("Not a set of frames from get_explosion_frames.")
+
+    def prepare_explosion_frames(self):
+        """Builds every explosion size up front so gameplay never has to."""
+        for size in EXPLOSION_SCALES:
+            self.get_explosion_frames(size)
+
 # Create a global instance of Assets
 assets = Assets()
\ No newline at end of file
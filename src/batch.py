@@ -0,0 +1,137 @@
+# ==============================================================================
+# Batch simulator: plays many headless games with bot policies across a process
+# pool and streams per-game results and a final summary to a JSON Lines file.
+# Run with: python -m src.batch --games 10000 [--bots random dodge greedy]
+# ==============================================================================
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+from multiprocessing import Pool
+from time import perf_counter
+from .settings import SIM_TICK_RATE
+from .bots import BOTS
+
+def _init_worker(base_spawn):
+    """Sets up a headless pygame and the gameplay assets once per worker process."""
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    os.environ["SDL_NO_SIGNAL_HANDLERS"] = "1" # Otherwise SDL swallows the pool's SIGTERM
+    import pygame
+    from . import simulation
+    from .assets import assets
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    assets.init(deferred=False)
+    assets.prepare_explosion_frames()
+
+    # Lets a batch try other spawn rates without editing the settings
+    if base_spawn is not None:
+        simulation.METEOR_BASE_SPAWN = base_spawn
+
+def play_game(job):
+    """Plays one game to the end, or to max_ticks, and returns its stats."""
+    from .simulation import Simulation
+    seed, bot_name, max_ticks = job
+    simulation = Simulation(seed)
+    bot = BOTS[bot_name](random.Random(seed ^ 0x5EED))
+
+    hits = shots = spawned = 0
+    meteors_alive = 0
+    max_meteors = 0
+    start = perf_counter()
+    while simulation.tick < max_ticks:
+        died = simulation.step(bot(simulation))
+        hits += simulation.sound_events.count("explosion")
+        shots += simulation.sound_events.count("laser")
+        spawned += simulation.spawns
+        count = simulation.meteor_count
+        meteors_alive += count
+        max_meteors = max(max_meteors, count)
+        if died:
+            break
+    elapsed = perf_counter() - start
+
+    ticks = simulation.tick
+    return {
+        "seed": seed,
+        "bot": bot_name,
+        "ticks": ticks,
+        "survival_s": round(simulation.elapsed_time, 3),
+        "died": simulation.game_over,
+        "score": simulation.score,
+        "shots": shots,
+        "hits": hits,
+        "spawned": spawned,
+        "meteors_alive_mean": round(meteors_alive / max(ticks, 1), 2),
+        "meteors_alive_max": max_meteors,
+        "tick_us": round(elapsed / max(ticks, 1) * 1e6, 2),
+    }
+
+def _summary(results):
+    """Aggregates per-game results into per-bot statistics."""
+    by_bot = {}
+    for result in results:
+        by_bot.setdefault(result["bot"], []).append(result)
+
+    summary = {}
+    for bot, games in sorted(by_bot.items()):
+        survival = sorted(game["survival_s"] for game in games)
+        deciles = statistics.quantiles(survival, n=10, method="inclusive") if len(survival) > 1 else survival * 9
+        summary[bot] = {
+            "games": len(games),
+            "survival_mean_s": round(statistics.fmean(survival), 2),
+            "survival_p10_s": round(deciles[0], 2),
+            "survival_p50_s": round(statistics.median(survival), 2),
+            "survival_p90_s": round(deciles[-1], 2),
+            "hits_mean": round(statistics.fmean(game["hits"] for game in games), 2),
+            "accuracy": round(sum(game["hits"] for game in games) / max(sum(game["shots"] for game in games), 1), 3),
+            "meteors_alive_mean": round(statistics.fmean(game["meteors_alive_mean"] for game in games), 2),
+            "tick_us_mean": round(statistics.fmean(game["tick_us"] for game in games), 2),
+        }
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play many headless games with scripted bots.")
+    parser.add_argument("--games", type=int, default=1000, help="games per bot")
+    parser.add_argument("--bots", nargs="+", choices=BOTS, default=list(BOTS))
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--seed", type=int, default=0, help="master seed the per-game seeds are drawn from")
+    parser.add_argument("--max-seconds", type=float, default=600, help="simulated seconds before a game is cut off")
+    parser.add_argument("--base-spawn", type=int, help="override METEOR_BASE_SPAWN, in ms")
+    parser.add_argument("--output", default="batch_results.jsonl", help="JSON Lines file the results stream to")
+    args = parser.parse_args(argv)
+
+    # Every game gets its own seed, so results don't depend on which worker ran it
+    rng = random.Random(args.seed)
+    max_ticks = int(args.max_seconds * SIM_TICK_RATE)
+    jobs = [(rng.getrandbits(32), bot, max_ticks) for bot in args.bots for _ in range(args.games)]
+
+    results = []
+    start = perf_counter()
+    pool = Pool(args.workers, initializer=_init_worker, initargs=(args.base_spawn,))
+    with open(args.output, "w") as output:
+        for result in pool.imap_unordered(play_game, jobs, chunksize=max(1, len(jobs) // (args.workers * 16))):
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+            results.append(result)
+            if len(results) % 100 == 0 or len(results) == len(jobs):
+                print(f"\r{len(results)}/{len(jobs)} games", end="", flush=True)
+
+        summary = _summary(results)
+        output.write(json.dumps({"summary": summary, "base_spawn": args.base_spawn, "seed": args.seed}) + "\n")
+    pool.close()
+    pool.join()
+    elapsed = perf_counter() - start
+
+    print(f"\nPlayed {len(jobs)} games in {elapsed:.1f} s with {args.workers} workers, results in {args.output}")
+    for bot, stats in summary.items():
+        print(f"{bot:<8} survival p50 {stats['survival_p50_s']:7.1f} s  mean {stats['survival_mean_s']:7.1f} s  "
+              f"hits {stats['hits_mean']:6.1f}  tick {stats['tick_us_mean']:6.1f} us")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+# ==============================================================================
+# Scripted benchmark scenarios with per-phase frame timings.
+# Run with: python -m src.bench [--baseline FILE] [--output FILE]
+# ==============================================================================
+
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import json
+import sys
+from collections import defaultdict
+from time import perf_counter
+import pygame
+from .settings import WINDOW_WIDTH, WINDOW_HEIGHT, FPS, BUTTON_SPACE
+from .assets import assets
+from .controls import InputState
+from .ui.renderer import Renderer
+
+PHASES = ("update", "collisions", "background", "sprites", "present")
+
+def _timed(samples, phase, func, *args):
+    """Calls func and records how long it took under the given phase."""
+    start = perf_counter()
+    func(*args)
+    samples[phase].append(perf_counter() - start)
+
+def _percentile(sorted_values, q):
+    """Returns the q-th percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def _summarize(values):
+    """Converts raw second samples into millisecond statistics."""
+    values = sorted(v * 1000 for v in values)
+    return {
+        "p50": round(_percentile(values, 50), 4),
+        "p95": round(_percentile(values, 95), 4),
+        "p99": round(_percentile(values, 99), 4),
+        "mean": round(sum(values) / len(values), 4) if values else 0.0,
+    }
+
+def _gameplay_frame(simulation, renderer, samples, inputs=InputState()):
+    """Runs one gameplay frame split into the same phases as Game.run."""
+    dt = 1 / FPS
+    _timed(samples, "update", simulation.update, inputs, dt)
+    _timed(samples, "collisions", simulation.collisions)
+    _timed(samples, "background", renderer.draw_background)
+    _timed(samples, "sprites", renderer.draw_world, simulation)
+    _timed(samples, "present", renderer.present)
+
+def scenario_meteors(display_surface, args):
+    """Keeps a fixed number of meteors in flight."""
+    from .simulation import Simulation
+    from .ui.background import Background
+    simulation = Simulation(seed=args.seed)
+    simulation.player.kill() # Keep the field running, nothing should end the scenario
+    renderer = Renderer(display_surface, Background.shared(), args.render == "dirty", batched=args.render == "batched",
+                        render_scale=args.render_scale)
+
+    def frame(samples):
+        while len(simulation.meteor_sprites) < args.meteors:
+            meteor = simulation.spawn_meteor()
+            meteor.rect.centery = simulation.rng.randint(0, WINDOW_HEIGHT)
+        _gameplay_frame(simulation, renderer, samples)
+    return frame
+
+def scenario_field(display_surface, args):
+    """Keeps a large number of meteors in flight in the vectorized meteor field."""
+    from .simulation import Simulation
+    from .ui.background import Background
+    simulation = Simulation(seed=args.seed, stress=True)
+    simulation.player.kill()
+    field = simulation.meteor_field
+    renderer = Renderer(display_surface, Background.shared(), args.render == "dirty", batched=args.render == "batched",
+                        render_scale=args.render_scale)
+
+    def frame(samples):
+        missing = args.field_meteors - len(field)
+        if missing > 0:
+            field.spawn(missing)
+            field.pos[field.count - missing:field.count, 1] = field.rng.uniform(0, WINDOW_HEIGHT, missing)
+        _gameplay_frame(simulation, renderer, samples)
+    return frame
+
+def scenario_lasers(display_surface, args):
+    """Keeps a fixed number of lasers flying through a light meteor field."""
+    from .simulation import Simulation
+    from .ui.background import Background
+    simulation = Simulation(seed=args.seed)
+    simulation.player.kill()
+    renderer = Renderer(display_surface, Background.shared(), args.render == "dirty", batched=args.render == "batched",
+                        render_scale=args.render_scale)
+
+    def frame(samples):
+        while len(simulation.laser_sprites) < args.lasers:
+            pos = (simulation.rng.randint(0, WINDOW_WIDTH), simulation.rng.randint(WINDOW_HEIGHT // 2, WINDOW_HEIGHT))
+            simulation.laser_pool.acquire(pos)
+        while len(simulation.meteor_sprites) < args.meteors // 4:
+            simulation.spawn_meteor()
+        _gameplay_frame(simulation, renderer, samples)
+    return frame
+
+def scenario_explosions(display_surface, args):
+    """Keeps a fixed number of explosions playing at once."""
+    from .simulation import Simulation
+    from .ui.background import Background
+    simulation = Simulation(seed=args.seed)
+    simulation.player.kill()
+    renderer = Renderer(display_surface, Background.shared(), args.render == "dirty", batched=args.render == "batched",
+                        render_scale=args.render_scale)
+    sizes = ("small", "normal", "large")
+
+    def frame(samples):
+        while len(simulation.explosion_sprites) < args.explosions:
+            pos = (simulation.rng.randint(0, WINDOW_WIDTH), simulation.rng.randint(0, WINDOW_HEIGHT))
+            simulation.explosion_pool.acquire(assets.get_explosion_frames(simulation.rng.choice(sizes)), pos)
+        _gameplay_frame(simulation, renderer, samples)
+    return frame
+
+def scenario_confetti(display_surface, args):
+    """The new high score game over screen with its confetti animation."""
+    from .sprites.confetti import AnimatedConfetti
+    from .ui.background import Background
+    background = Background.shared()
+    confetti_sprites = pygame.sprite.Group()
+    overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
+    overlay.fill((0, 0, 0, 125))
+
+    def draw_sprites():
+        confetti_sprites.draw(display_surface)
+        display_surface.blit(overlay, (0, 0))
+
+    def frame(samples):
+        if not confetti_sprites:
+            AnimatedConfetti(assets.confetti_frames, confetti_sprites)
+        _timed(samples, "update", confetti_sprites.update, 1 / FPS)
+        _timed(samples, "background", background.draw, display_surface)
+        _timed(samples, "sprites", draw_sprites)
+        _timed(samples, "present", pygame.display.update)
+    return frame
+
+def scenario_menu(display_surface, args):
+    """The main menu sitting idle."""
+    from .ui.background import Background
+    from .ui.button import Button
+    renderer = Renderer(display_surface, Background.shared(), args.render == "dirty", batched=args.render == "batched")
+    x, y = WINDOW_WIDTH // 2, WINDOW_HEIGHT // 3
+    buttons = [Button(text, assets.font_large, (x, y + i * BUTTON_SPACE), None)
+               for i, text in enumerate(("Play", "Settings", "How to Play", "Exit"))]
+    player_rect = assets.player_surf.get_rect(center=(x, y - BUTTON_SPACE))
+
+    def draw_background():
+        if renderer.needs_redraw:
+            renderer.draw_background()
+
+    def draw_sprites():
+        if renderer.needs_redraw:
+            display_surface.blit(assets.player_surf, player_rect, special_flags=assets.sprite_blend_flags)
+            for button in buttons:
+                button.draw(display_surface)
+
+    def frame(samples):
+        _timed(samples, "background", draw_background)
+        _timed(samples, "sprites", draw_sprites)
+        _timed(samples, "present", renderer.present)
+    return frame
+
+SCENARIOS = {
+    "meteors": scenario_meteors,
+    "field": scenario_field,
+    "lasers": scenario_lasers,
+    "explosions": scenario_explosions,
+    "confetti": scenario_confetti,
+    "menu": scenario_menu,
+}
+
+def run_scenario(name, display_surface, args):
+    """Runs a scenario and returns its per-phase and whole-frame statistics."""
+    frame = SCENARIOS[name](display_surface, args)
+    for _ in range(args.warmup):
+        frame(defaultdict(list))
+
+    samples = defaultdict(list)
+    for _ in range(args.frames):
+        start = perf_counter()
+        frame(samples)
+        samples["frame"].append(perf_counter() - start)
+    return {phase: _summarize(samples[phase]) for phase in PHASES + ("frame",) if samples[phase]}
+
+def compare(results, baseline, tolerance, floor):
+    """Returns a list of regressions where a p95 got slower than the baseline allows."""
+    regressions = []
+    for scenario, phases in results.items():
+        for phase, stats in phases.items():
+            base = baseline.get(scenario, {}).get(phase)
+            if not base:
+                continue
+            limit = base["p95"] * (1 + tolerance)
+            if stats["p95"] > limit and stats["p95"] - base["p95"] > floor:
+                regressions.append(f"{scenario}.{phase}: p95 {stats['p95']:.3f} ms > {base['p95']:.3f} ms baseline")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark game scenarios under the dummy video driver.")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--frames", type=int, default=600, help="measured frames per scenario")
+    parser.add_argument("--warmup", type=int, default=120, help="unmeasured frames before measuring")
+    parser.add_argument("--render", choices=("full", "batched", "dirty"), default="batched", help="frame presentation path")
+    parser.add_argument("--render-scale", type=float, default=1.0, help="world resolution as a fraction of the window")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--meteors", type=int, default=200)
+    parser.add_argument("--field-meteors", type=int, default=3000, help="meteors kept in flight by the field scenario")
+    parser.add_argument("--lasers", type=int, default=100)
+    parser.add_argument("--explosions", type=int, default=40)
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed p95 slowdown as a fraction")
+    parser.add_argument("--floor", type=float, default=0.05, help="ignore p95 slowdowns smaller than this many ms")
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    display_surface = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    assets.init()
+    assets.prepare_explosion_frames()
+
+    results = {name: run_scenario(name, display_surface, args) for name in args.scenarios}
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance, args.floor)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+# ==============================================================================
+# Scripted bot policies that play the simulation in place of the keyboard.
+# ==============================================================================
+
+import random
+from .settings import WINDOW_WIDTH
+from .controls import InputState
+
+class RandomBot:
+    """Wanders in random directions, changing course now and then, and shoots at random."""
+    def __init__(self, rng=random):
+        self.rng = rng
+        self.inputs = InputState()
+
+    def __call__(self, simulation):
+        rng = self.rng
+        if rng.random() < 0.02:
+            self.inputs = InputState(*(rng.random() < 0.3 for _ in range(4)))
+        return self.inputs._replace(shoot=rng.random() < 0.05)
+
+def _nearest_meteor(simulation, rng, above_only=True):
+    """Returns the meteor closest to the player, ignoring those already below it.
+    Meteors at the same distance are picked between at random."""
+    px, py = simulation.player.rect.center
+    best, best_distance, ties = None, float("inf"), 0
+    for meteor in simulation.meteor_sprites:
+        mx, my = meteor.rect.center
+        if above_only and my > py:
+            continue
+        distance = (mx - px) ** 2 + (my - py) ** 2
+        if distance < best_distance:
+            best, best_distance, ties = meteor, distance, 1
+        elif distance == best_distance:
+            # Keep each tied meteor with equal chance
+            ties += 1
+            if rng.random() < 1 / ties:
+                best = meteor
+    return best
+
+class DodgeBot:
+    """Sidesteps whichever meteor is closest, never shooting."""
+    def __init__(self, rng=random, margin=150):
+        self.rng = rng
+        self.margin = margin # px, horizontal distance that counts as safe
+
+    def __call__(self, simulation):
+        meteor = _nearest_meteor(simulation, self.rng)
+        if meteor is None:
+            return InputState()
+        px = simulation.player.rect.centerx
+        mx = meteor.rect.centerx
+        if abs(mx - px) > self.margin:
+            return InputState()
+
+        # Move away from the meteor, unless that runs into the edge of the screen
+        go_left = mx > px if mx != px else self.rng.random() < 0.5 # Straight above, either way will do
+        if go_left and simulation.player.rect.left <= 0:
+            go_left = False
+        elif not go_left and simulation.player.rect.right >= WINDOW_WIDTH:
+            go_left = True
+        return InputState(left=go_left, right=not go_left)
+
+class GreedyShooter:
+    """Lines up under the nearest meteor and fires whenever it can."""
+    def __init__(self, rng=random, tolerance=12):
+        self.rng = rng
+        self.tolerance = tolerance # px, close enough to fire
+
+    def __call__(self, simulation):
+        meteor = _nearest_meteor(simulation, self.rng)
+        if meteor is None:
+            return InputState()
+        offset = meteor.rect.centerx - simulation.player.rect.centerx
+        aligned = abs(offset) <= self.tolerance
+        return InputState(left=offset < -self.tolerance, right=offset > self.tolerance, shoot=aligned)
+
+BOTS = {"random": RandomBot, "dodge": DodgeBot, "greedy": GreedyShooter}
@@ -0,0 +1,66 @@
+# ==============================================================================
+# Broadphase and narrowphase helpers for sprite collisions.
+# ==============================================================================
+
+import pygame
+from .settings import COLLISION_CELL_SIZE
+
+class SpatialHash:
+    def __init__(self, cell_size=COLLISION_CELL_SIZE):
+        self.cell_size = cell_size
+        self._cells = {}
+
+    def _cell_range(self, rect):
+        """Returns the range of grid cells covered by a rectangle."""
+        size = self.cell_size
+        return (int(rect.left // size), int(rect.right // size),
+                int(rect.top // size), int(rect.bottom // size))
+
+    def rebuild(self, sprites):
+        """Clears the grid and inserts every sprite into the cells its rect overlaps."""
+        self._cells.clear()
+        cells = self._cells
+        for sprite in sprites:
+            x0, x1, y0, y1 = self._cell_range(sprite.rect)
+            for cx in range(x0, x1 + 1):
+                for cy in range(y0, y1 + 1):
+                    bucket = cells.get((cx, cy))
+                    if bucket is None:
+                        cells[(cx, cy)] = [sprite]
+                    else:
+                        bucket.append(sprite)
+
+    def query(self, rect):
+        """Returns the sprites sharing a cell with the rectangle, without duplicates."""
+        x0, x1, y0, y1 = self._cell_range(rect)
+        cells = self._cells
+        if x0 == x1 and y0 == y1:
+            return cells.get((x0, y0), [])
+
+        # Dict keeps the insertion order, so results stay deterministic
+        found = {}
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                for sprite in cells.get((cx, cy), ()):
+                    found[sprite] = None
+        return list(found)
+
+    def pairs(self, sprites):
+        """Yields (sprite, candidate) pairs whose rects share at least one cell."""
+        for sprite in sprites:
+            for candidate in self.query(sprite.rect):
+                yield sprite, candidate
+
+def bounding_radius(surf, scale=1):
+    """Returns the radius of a circle around the surface center that contains all of its pixels."""
+    w, h = surf.get_size()
+    return (w * w + h * h) ** 0.5 * scale / 2
+
+def collide_circle_mask(left, right):
+    """Rejects pairs with a cheap bounding circle test before the pixel-perfect mask check."""
+    dx = left.rect.centerx - right.rect.centerx
+    dy = left.rect.centery - right.rect.centery
+    reach = left.radius + right.radius
+    if dx * dx + dy * dy > reach * reach:
+        return False
+    return pygame.sprite.collide_mask(left, right) is not None
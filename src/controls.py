@@ -0,0 +1,25 @@
+# ==============================================================================
+# Player input for a single simulation tick.
+# ==============================================================================
+
+import pygame
+from typing import NamedTuple
+
+class InputState(NamedTuple):
+    left: bool = False
+    right: bool = False
+    up: bool = False
+    down: bool = False
+    shoot: bool = False # True only on the tick the shoot key went down
+
+def read_keyboard():
+    """Builds an InputState from the current keyboard state."""
+    keys = pygame.key.get_pressed()
+    recent_keys = pygame.key.get_just_pressed()
+    return InputState(
+        left=bool(keys[pygame.K_a] or keys[pygame.K_LEFT]),
+        right=bool(keys[pygame.K_d] or keys[pygame.K_RIGHT]),
+        up=bool(keys[pygame.K_w] or keys[pygame.K_UP]),
+        down=bool(keys[pygame.K_s] or keys[pygame.K_DOWN]),
+        shoot=bool(recent_keys[pygame.K_SPACE]),
+    )
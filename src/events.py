@@ -1,7 +0,0 @@
-# ==============================================================================
-# Custom pygame events used by the game.
-# ==============================================================================
-
-import pygame
-
-METEOR_SPAWN_EVENT = pygame.USEREVENT + 1
\ No newline at end of file
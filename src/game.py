@@ -1,130 +1,216 @@
 # ==============================================================================
-# The core game logic and main game loop.
+# The interactive game loop: input, audio and rendering around the simulation.
 # ==============================================================================
 
 import pygame
-import math
-from .settings import WINDOW_WIDTH, WINDOW_HEIGHT, FPS, METEOR_BASE_SPAWN, BG_COLOR, ACCENT_COLOR, TEXT_COLOR, VERTICAL_MARGIN
-from .events import METEOR_SPAWN_EVENT
+from .settings import (
+    WINDOW_WIDTH, WINDOW_HEIGHT, FPS, MAX_CATCH_UP_STEPS, RECORD_REPLAYS, RENDER_SCALE, DYNAMIC_RESOLUTION,
+    QUALITY_GOVERNOR, BG_COLOR, ACCENT_COLOR, TEXT_COLOR, VERTICAL_MARGIN
+)
 from .assets import assets
+from .controls import read_keyboard
+from .simulation import Simulation
+from .replay import ReplayRecorder
+from .profiling import FrameTimers
+from .quality import QualityGovernor
+from .telemetry import telemetry
 from .ui.background import Background
-from .sprites.player import Player
-from .sprites.meteor import Meteor
-from .sprites.explosion import AnimatedExplosion
+from .ui.perf_overlay import PerfOverlay
+from .ui.renderer import Renderer
+from .ui.text_cache import text_cache
 from .sprites.confetti import AnimatedConfetti
 
+RENDER_PHASES = ("background", "draw", "present") # The part of a frame the render scale can make cheaper
+
 class Game:
-    def __init__(self, display_surface, sounds, high_score_manager):
+    def __init__(self, display_surface, sounds, high_score_manager, stress=False, record=RECORD_REPLAYS,
+                 render_scale=RENDER_SCALE, dynamic_resolution=DYNAMIC_RESOLUTION):
         self.display_surface = display_surface
         self.clock = pygame.time.Clock()
         self.sounds = sounds
         self.high_score_manager = high_score_manager
 
-        # Sprite groups
-        self.all_sprites = pygame.sprite.Group()
-        self.meteor_sprites = pygame.sprite.Group()
-        self.laser_sprites = pygame.sprite.Group()
-        self.explosion_sprites = pygame.sprite.Group()
+        # Hot-path timers, always recording so stutter can be dumped after the fact
+        self.timers = FrameTimers(("update", "collisions", "background", "draw", "present"),
+                                  ("meteors", "lasers", "explosions", "voices", "sfx_merged", "sfx_dropped", "quality"))
+        self.perf_overlay = PerfOverlay(self.timers, assets.font_debug)
+
+        # The world itself lives in the simulation, the game only drives and draws it
+        self.simulation = Simulation(timers=self.timers, stress=stress)
         self.confetti_sprites = pygame.sprite.Group()
 
+        # Sheds effects while frames run over budget. Stress mode is there to measure the engine, so it stays off.
+        self.governor = QualityGovernor(enabled=QUALITY_GOVERNOR and not stress)
+
         # Game state
-        self.score = 0
-        self.elapsed_time = 0
-        self.music_elapsed_time = 0.0
+        self.accumulator = 0.0 # Frame time not yet simulated, in seconds
+        self.shoot_queued = False # Shoot pressed since the last tick, fired on the next one
+        self.record = record
+        self.recorder = None
+        self.shots = 0
+        self.hits = 0
+        self.frame_spawned = 0 # Meteors spawned and destroyed since the last telemetry frame
+        self.frame_destroyed = 0
         self.running = True
         self.paused = False
         self.frozen_screen = None
 
         # Objects
-        self.player = None
-        self.background = Background()
-
-    # Function to calculate spawn rate based on score
-    # The spawn rate decreases (meteors spawn faster) as the player's score increases
-    def _calculate_spawn_rate(self) -> int:
-        """Return spawn interval in ms. Fewer ms = more meteors.
-        Uses a gentle logarithmic curve so difficulty ramps smoothly."""
-        # Use a diminishing returns curve
-        interval = METEOR_BASE_SPAWN - int(200 * (math.log1p(self.score) / math.log1p(100)))
-        return max(100, interval)
+        self.background = Background.shared()
+        self.renderer = Renderer(display_surface, self.background, render_scale=render_scale,
+                                 dynamic_resolution=dynamic_resolution)
+        self._score_panel_cache = (None, None)
+
+        # Build the shared explosion frame sets before gameplay starts
+        assets.prepare_explosion_frames()
+
+    @property
+    def score(self):
+        return self.simulation.score
 
     def reset(self, volume):
         """Resets the game state for a new round."""
-        self.all_sprites.empty()
-        self.meteor_sprites.empty()
-        self.laser_sprites.empty()
-        self.explosion_sprites.empty()
+        self.simulation.reset()
         self.confetti_sprites.empty()
-
-        # Recreate the player
-        self.player = Player(self.all_sprites, assets.player_surf, assets.laser_surf, self.laser_sprites, self.sounds)
-
-        # Reset the survival time
-        self.score = 0
-        self.elapsed_time = 0
-        self.music_elapsed_time = 0.0
+        self.accumulator = 0.0
+        self.shoot_queued = False
+        self.recorder = ReplayRecorder(self.simulation) if self.record else None
+        self.governor.reset_average()
+        self._apply_quality()
+        self.shots = 0
+        self.hits = 0
+        self.frame_spawned = 0
+        self.frame_destroyed = 0
+        telemetry.emit("round", stress=self.simulation.stress)
 
         # Reset the game state
         self.running = True
-
-        # Create a custom event for meteor spawning based on the updated spawn rate
-        pygame.time.set_timer(METEOR_SPAWN_EVENT, self._calculate_spawn_rate())
+        self.renderer.invalidate()
 
         # Reset volume
         self.sounds.set_volume(0.0 if self.sounds.is_mute() else volume)
         self.sounds.play_game_music()
 
+        # The first frame shouldn't count the time spent in menus and setting up
+        self.clock.tick()
+
+    def _queue_sounds(self):
+        """Queues the sound effects the simulation triggered during the last step."""
+        for name in self.simulation.sound_events:
+            self.sounds.sfx.trigger(name)
+
+    def _advance(self, frame_dt, step):
+        """Runs as many fixed simulation ticks as the frame time covers, at most MAX_CATCH_UP_STEPS.
+        step is called once per tick and returns True to stop early.
+        Returns how far the frame is between the last two ticks, from 0 to 1."""
+        tick = self.simulation.dt
+        self.accumulator += frame_dt
+        steps = 0
+        while self.accumulator >= tick:
+            self.accumulator -= tick
+            steps += 1
+            if step():
+                break
+            if steps == MAX_CATCH_UP_STEPS:
+                # Too slow to keep up, drop the backlog instead of falling further behind
+                self.accumulator %= tick
+                break
+        self.sounds.sfx.flush()
+        return min(self.accumulator / tick, 1.0)
+
+    def _step(self, inputs):
+        """Advances the simulation one tick. Returns True once the player has died.
+        A shot pressed since the last tick fires on this tick only, even if a frame runs several or none."""
+        inputs = inputs._replace(shoot=self.shoot_queued)
+        self.shoot_queued = False
+        game_over = self.simulation.step(inputs)
+        if self.recorder:
+            self.recorder.record(inputs)
+        events = self.simulation.sound_events
+        destroyed = events.count('explosion')
+        self.shots += events.count('laser')
+        self.hits += destroyed
+        self.frame_spawned += self.simulation.spawns
+        self.frame_destroyed += destroyed
+        self._queue_sounds()
+        return game_over
+
+    def _apply_quality(self):
+        """Hands the governor's tier to the simulation. While recording, the tiers only thin out explosions,
+        as rotation and the meteor cap change what happens and the replay couldn't reproduce it."""
+        tier = self.governor.settings
+        if self.recorder:
+            self.simulation.set_quality(tier.explosion_step, tier.skip_explosions)
+        else:
+            self.simulation.set_quality(tier.explosion_step, tier.skip_explosions, tier.rotation_interval,
+                                        tier.max_meteors)
+
+    def _update_quality(self, frame_ms):
+        """Feeds the frame time to the governor and applies and logs any tier change."""
+        governor = self.governor
+        if not governor.update(frame_ms):
+            return
+        self._apply_quality()
+        print(f"Quality tier {governor.tier} ({governor.name}), average frame {governor.average:.1f} ms")
+        telemetry.emit("quality", tier=governor.tier, name=governor.name, average_ms=round(governor.average, 2))
+
+    def _run_stats(self):
+        """The stats kept with the run on the leaderboard."""
+        simulation = self.simulation
+        return {"seconds": round(simulation.elapsed_time, 2), "ticks": simulation.tick,
+                "shots": self.shots, "hits": self.hits, "stress": simulation.stress}
+
+    def _score_panel(self):
+        """Returns the score text in its framed box, rebuilt only when the score changes."""
+        if self._score_panel_cache[0] != self.score:
+            text_surf = text_cache.render_number(assets.font_small, self.score, TEXT_COLOR)
+            panel = pygame.Surface(text_surf.get_rect().inflate(20, 10).size, pygame.SRCALPHA)
+            panel_rect = panel.get_rect()
+
+            # Draw background and score text
+            pygame.draw.rect(panel, BG_COLOR, panel_rect, 0, 10)
+            panel.blit(text_surf, text_surf.get_rect(center=panel_rect.move(0, 5).center))
+            pygame.draw.rect(panel, ACCENT_COLOR, panel_rect, 5, 10)
+            self._score_panel_cache = (self.score, panel)
+        return self._score_panel_cache[1]
+
     def _display_score(self):
-        """Renders and displays the score on the screen."""
+        """Displays the score on the screen and returns the area it covers."""
 
         # Display the score in the bottom-center of the screen
-        text_surf = assets.font_small.render(str(self.score), True, TEXT_COLOR)
-        text_rect = text_surf.get_rect(midbottom=(WINDOW_WIDTH / 2, WINDOW_HEIGHT - VERTICAL_MARGIN / 2))
-
-        # Draw background and score text
-        pygame.draw.rect(self.display_surface, BG_COLOR, text_rect.inflate(20, 10).move(0, -5), 0, 10)
-        self.display_surface.blit(text_surf, text_rect)
-        pygame.draw.rect(self.display_surface, ACCENT_COLOR, text_rect.inflate(20,10).move(0,-5), 5, 10)
+        panel = self._score_panel()
+        panel_rect = panel.get_rect(midbottom=(WINDOW_WIDTH / 2, WINDOW_HEIGHT - VERTICAL_MARGIN / 2))
+        return self.renderer.blit_hud(panel, panel_rect.topleft)
 
     def _display_mute(self):
         # Display the mute sign in the top-center of the screen
         mute_rect = assets.mute_surf.get_rect(midtop=(WINDOW_WIDTH / 2, VERTICAL_MARGIN / 4))
-        self.display_surface.blit(assets.mute_surf, mute_rect)
-
-    def _collisions(self):
-        """Return True if the player died this frame."""
-
-        # Player-Meteor collisions
-        if self.player and self.player.alive():
-            collided = pygame.sprite.spritecollide(
-                self.player, self.meteor_sprites, dokill=True, collided=pygame.sprite.collide_mask
-            )
-            if collided:
-                try:
-                    self.sounds.death.play()
-                except Exception:
-                    pass
-
-                # Trigger explosion animation at player position
-                AnimatedExplosion(assets.explosion_frames, self.player.rect.center,
-                                  (self.all_sprites, self.explosion_sprites), size='large')
-                self.player.kill()
-                return True
-
-        # Laser-Meteor collisions
-        for laser in list(self.laser_sprites):
-            # Use rect collision then mask for confirm
-            possible = pygame.sprite.spritecollide(laser, self.meteor_sprites, dokill=True, collided= pygame.sprite.collide_mask)
-            if possible:
-                laser.kill()
-                meteor = possible[0]
-                AnimatedExplosion(assets.explosion_frames, meteor.rect.center,
-                                  (self.all_sprites, self.explosion_sprites), size=meteor.size_category)
-                try:
-                    self.sounds.explosion.play()
-                except Exception:
-                    pass
-        return False
+        return self.renderer.blit_hud(assets.mute_surf, mute_rect.topleft)
+
+    def _begin_frame(self, dt):
+        """Starts timing a frame and records the sprite and sound counts, in the timers and the telemetry."""
+        simulation = self.simulation
+        sfx = self.sounds.sfx
+        meteors = simulation.meteor_count
+        lasers = len(simulation.laser_sprites)
+        explosions = len(simulation.explosion_sprites)
+        self.timers.begin_frame(dt * 1000, meteors=meteors, lasers=lasers, explosions=explosions,
+                                voices=sfx.voices, sfx_merged=sfx.merged, sfx_dropped=sfx.dropped,
+                                quality=self.governor.tier)
+        if telemetry.enabled: # Skips building the fields on every frame when telemetry is off
+            telemetry.emit("frame", ms=round(dt * 1000, 3), meteors=meteors, lasers=lasers, explosions=explosions,
+                           spawned=self.frame_spawned, destroyed=self.frame_destroyed,
+                           scale=self.renderer.render_scale, quality=self.governor.tier)
+        self._update_quality(dt * 1000)
+        self.frame_spawned = 0
+        self.frame_destroyed = 0
+
+    def _present(self):
+        """Draws the performance overlay and updates the screen display."""
+        self.renderer.add_overlay(self.perf_overlay.draw(self.display_surface))
+        self.renderer.present()
+        self.timers.record('present')
+        self.renderer.adapt(self.timers.work_ms(RENDER_PHASES))
 
     def run(self, volume):
         """The main game loop."""
@@ -132,52 +218,56 @@ class Game:
             self.reset(volume)
 
             while self.running:
-                dt = self.clock.tick(FPS) / 1000.0  # Delta time in seconds (for frame rate independent movement)
+                dt = self.clock.tick(FPS) / 1000.0  # Frame time in seconds, simulated in fixed ticks
+                self._begin_frame(dt)
 
                 # Event handling
                 for event in pygame.event.get():
                     if event.type == pygame.QUIT:
                         pygame.quit()
                         exit()
-                    if event.type == METEOR_SPAWN_EVENT: # Spawn a new meteor when the timer expires
-                        if not self.paused:
-                            Meteor(assets.meteor_surf, (self.all_sprites, self.meteor_sprites))
-                            pygame.time.set_timer(METEOR_SPAWN_EVENT, self._calculate_spawn_rate()) # Reset timer
                     if event.type == pygame.KEYDOWN:
                         if event.key == pygame.K_p:
                             if not self.paused:
                                 self.paused = True
+                                telemetry.emit("pause", tick=self.simulation.tick)
                                 self.frozen_screen = self.display_surface.copy()
                         if event.key == pygame.K_m:
                             self.sounds.toggle_mute(volume)
+                        if event.key == pygame.K_F3:
+                            self.perf_overlay.toggle()
+                        if event.key == pygame.K_F4:
+                            self.perf_overlay.dump()
 
                 if not self.paused:
-                    self.elapsed_time += dt
-                    self.score = int(self.elapsed_time)
-                    self.music_elapsed_time += dt
-
-                    self.all_sprites.update(dt)
-
-                    # Check for collisions and see if the player has died
-                    if self._collisions() or not self.player.alive():
+                    # Advance the world in fixed ticks and check if the player has died
+                    self.timers.mark()
+                    inputs = read_keyboard()
+                    self.shoot_queued |= inputs.shoot
+                    alpha = self._advance(dt, lambda: self._step(inputs))
+                    if self.simulation.game_over:
                         self.running = False  # End the main game loop
 
-                    self.background.draw(self.display_surface)
-                    self.all_sprites.draw(self.display_surface)
+                    self.background.update(dt)
+                    self.renderer.draw_background()
+                    self.timers.record('background')
+                    self.renderer.draw_world(self.simulation, alpha)
                     self._display_score()
                     if self.sounds.is_mute():
                         self._display_mute()
+                    self.timers.record('draw')
                 else:
                     game_volume = self.sounds.get_game_volume()
 
-                    # Accounting for playback delay
-                    self.music_elapsed_time += self.clock.get_time() / 1000.0
-
                     from .ui.menus import pause_menu
-                    result = pause_menu(self.display_surface, self.sounds, self.frozen_screen, self.music_elapsed_time)
+                    result = pause_menu(self.display_surface, self.sounds, self.frozen_screen)
+                    telemetry.emit("resume", result=result)
 
                     self.paused = False
+                    self.renderer.invalidate() # The pause menu drew over the whole screen
                     self.clock.tick()
+                    self.accumulator = 0.0
+                    self.governor.reset_average()
                     self.sounds.set_volume(game_volume)
 
                     if result == "restart":
@@ -186,15 +276,17 @@ class Game:
                         return
 
                 # Update the screen display
-                pygame.display.update()
+                self._present()
 
-            if self._collisions() or not self.player.alive():
-                # Stop the meteor spawn timer to prevent any new meteors after the game ends.
-                pygame.time.set_timer(METEOR_SPAWN_EVENT, 0)
+            if self.simulation.game_over:
+                telemetry.emit("death", score=self.score, **self._run_stats())
+                if self.recorder:
+                    self.recorder.save()
 
                 # This loop runs after the player has died to show the explosion animation.
-                while self.explosion_sprites:
+                while self.simulation.explosion_sprites:
                     dt = self.clock.tick(FPS) / 1000.0
+                    self._begin_frame(dt)
 
                     # Event loop to allow quitting during the animation
                     for event in pygame.event.get():
@@ -202,30 +294,32 @@ class Game:
                             pygame.quit()
                             exit()
 
-                    # Update all sprites to keep the game world moving, but stop player input
-                    self.all_sprites.update(dt)
-                    self.explosion_sprites.update(dt)
+                    # Keep the game world moving, but stop player input
+                    self.timers.mark()
+                    alpha = self._advance(dt, lambda: not self.simulation.step_aftermath())
 
                     # Redraw the screen to show the animation
-                    self.background.draw(self.display_surface)
-                    self.all_sprites.draw(self.display_surface)
-                    self.explosion_sprites.draw(self.display_surface)
+                    self.renderer.draw_background()
+                    self.timers.record('background')
+                    self.renderer.draw_world(self.simulation, alpha)
+                    self.timers.record('draw')
 
                     # Update the screen
-                    pygame.display.update()
+                    self._present()
 
-                # Creating confetti animation
-                if self.score > self.high_score_manager.get_high_score():
-                    AnimatedConfetti(assets.confetti_frames, (self.all_sprites, self.confetti_sprites))
+                # Creating confetti animation, left out at the lower quality tiers
+                if self.score > self.high_score_manager.get_high_score() and self.governor.settings.confetti:
+                    AnimatedConfetti(assets.confetti_frames, self.confetti_sprites)
 
                 # Once the explosion animation is complete, transition to the game over menu.
                 from .ui.menus import game_over_menu
 
                 # The game over menu now returns a boolean to control the outer loop.
-                should_play_again = game_over_menu(self.display_surface, self.sounds, self.score, self.high_score_manager, self.confetti_sprites)
+                should_play_again = game_over_menu(self.display_surface, self.sounds, self.score, self.high_score_manager,
+                                                    self.confetti_sprites, self._run_stats())
 
                 self.clock.tick()
 
                 # If the user chooses "Main Menu" (False), break the outer loop and exit.
                 if not should_play_again:
-                    break
\ No newline at end of file
+                    break
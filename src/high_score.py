@@ -1,35 +1,192 @@
 # ==============================================================================
-# A class to manage and persist the high score.
+# The leaderboard: the best runs with their stats, held in memory and persisted
+# by a background writer as an append-only log plus a compacted snapshot.
 # ==============================================================================
 
-from .settings import HIGH_SCORE_FILE
+import atexit
+import bisect
+import json
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from .settings import HIGH_SCORE_FILE, LEADERBOARD_DIR, LEADERBOARD_SIZE, LEADERBOARD_COMPACT_EVERY
+
+SNAPSHOT_VERSION = 1
 
 class HighScoreManager:
-    def __init__(self):
-        self.path = HIGH_SCORE_FILE
-        self._high_score = self.load_high_score()
-
-    def load_high_score(self) -> int:
-        """
-        Loads the high score from a file. If the file doesn't exist,
-        it creates the file and initializes the high score to 0.
-        """
+    def __init__(self, directory=LEADERBOARD_DIR, size=LEADERBOARD_SIZE, compact_every=LEADERBOARD_COMPACT_EVERY):
+        self.directory = Path(directory)
+        self.log_path = self.directory / "runs.log"
+        self.snapshot_path = self.directory / "snapshot.json"
+        self.size = size
+        self.compact_every = compact_every
+
+        # In-memory index, the only thing gameplay ever reads
+        self.top = [] # Best runs first
+        self._keys = [] # (-score, time) of every run in top, kept sorted for bisect
+        self._scores = [] # Scores of every run ever logged, sorted, for rank lookups
+        self._histogram = Counter() # score -> runs, what the snapshot stores instead of every run
+
+        self._log_end = 0 # Bytes of the log that hold complete runs
+        self._pending = 0 # Runs logged since the last snapshot
+        self.load()
+
+        # Disk writes happen on their own thread, in the order they were queued
+        self._queue = queue.SimpleQueue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="leaderboard", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+        if not self.log_path.exists() and not self.snapshot_path.exists():
+            self._import_legacy()
+
+    def load(self):
+        """Reads the snapshot, then replays only the runs logged after it."""
+        offset = 0
+        try:
+            with open(self.snapshot_path, "r") as f:
+                snapshot = json.load(f)
+            if snapshot.get("version") == SNAPSHOT_VERSION:
+                offset = snapshot["log_offset"]
+                for run in snapshot["top"]:
+                    self._insert_top(run)
+                self._histogram.update({int(score): count for score, count in snapshot["scores"].items()})
+        except (OSError, ValueError, KeyError):
+            # No snapshot yet or a damaged one, rebuild everything from the log
+            offset = 0
+            self.top.clear()
+            self._keys.clear()
+            self._histogram.clear()
+
+        self._log_end = offset
+        try:
+            with open(self.log_path, "rb") as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break # Torn write from a crash, the writer cuts it off
+                    self._log_end += len(line)
+                    try:
+                        run = json.loads(line)
+                    except ValueError:
+                        continue
+                    self._insert_top(run)
+                    self._histogram[run["score"]] += 1
+                    self._pending += 1
+        except OSError:
+            pass
+
+        self._scores = sorted(self._histogram.elements())
+
+    def _import_legacy(self):
+        """Carries the score the old single-number high score file saved over to a new leaderboard.
+        The file was only ever written by a finished game, so a missing or empty one is left alone."""
         try:
-            with open(HIGH_SCORE_FILE, "r") as f:
-                return int(f.read().strip() or 0)
-        except (IOError, ValueError):
-            # File not found or invalid content, return 0.
-            return 0
-
-    def save_high_score(self, score: int):
-        """Saves a new high score to the file if it's greater than the current high score."""
-        if score > self._high_score:
-            self._high_score = score
-            with open(self.path, 'w') as f:
-                f.write(str(self._high_score))
-            return True
-        return False
+            score = int(HIGH_SCORE_FILE.read_text().strip() or 0)
+            timestamp = HIGH_SCORE_FILE.stat().st_mtime
+        except (OSError, ValueError):
+            return
+        if score > 0:
+            self._add({"score": score, "time": timestamp, "stats": {"legacy": True}})
+
+    def _insert_top(self, run):
+        """Puts a run into the top list if it makes the cut. Returns its place, or None."""
+        key = (-run["score"], run["time"])
+        index = bisect.bisect(self._keys, key)
+        if index >= self.size:
+            return None
+        self._keys.insert(index, key)
+        self.top.insert(index, run)
+        if len(self.top) > self.size:
+            self._keys.pop()
+            self.top.pop()
+        return index
+
+    def _add(self, run):
+        """Adds a run to the index and queues it for the writer, with a snapshot every compact_every runs."""
+        self._insert_top(run)
+        self._histogram[run["score"]] += 1
+        bisect.insort(self._scores, run["score"])
+        self._pending += 1
+        snapshot = None
+        if self._pending >= self.compact_every:
+            snapshot = self._snapshot()
+        self._queue.put((run, snapshot))
+
+    def _snapshot(self):
+        """Copies the index for the writer. The log offset is filled in once the runs before it are on disk."""
+        self._pending = 0
+        return {"version": SNAPSHOT_VERSION, "log_offset": None, "top": list(self.top),
+                "scores": {str(score): count for score, count in self._histogram.items()}}
+
+    def record_run(self, score, stats=None):
+        """Records a finished run without touching the disk. Returns its rank among all runs."""
+        self._add({"score": score, "time": time.time(), "stats": stats or {}})
+        return self.rank(score)
+
+    def rank(self, score):
+        """Returns the rank a score has among every run recorded, 1 being the best. Ties share a rank."""
+        return len(self._scores) - bisect.bisect_right(self._scores, score) + 1
+
+    def runs(self):
+        """Returns how many runs have been recorded."""
+        return len(self._scores)
 
     def get_high_score(self):
         """Returns the current high score."""
-        return self._high_score
\ No newline at end of file
+        return self.top[0]["score"] if self.top else 0
+
+    def _open_log(self):
+        """Creates the directory on the first write and opens the log, cutting off any torn last run."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        log = open(self.log_path, "ab")
+        if log.tell() > self._log_end:
+            log.truncate(self._log_end)
+            log.seek(self._log_end)
+        return log
+
+    def _write_loop(self):
+        log = None
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                if log is None:
+                    log = self._open_log()
+                run, snapshot = item
+                if run is not None:
+                    log.write(json.dumps(run, separators=(",", ":")).encode() + b"\n")
+                    log.flush()
+                if snapshot is not None:
+                    os.fsync(log.fileno())
+                    snapshot["log_offset"] = log.tell()
+                    self._write_snapshot(snapshot)
+        except OSError as e:
+            print(f"Error saving leaderboard: {e}")
+        finally:
+            if log is not None:
+                log.close()
+
+    def _write_snapshot(self, snapshot):
+        """Writes the snapshot beside the old one and swaps it in, so a crash leaves one or the other intact."""
+        temp_path = self.snapshot_path.with_suffix(".tmp")
+        with open(temp_path, "w") as f:
+            json.dump(snapshot, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.snapshot_path)
+
+    def close(self):
+        """Snapshots any runs logged since the last one and waits for the writer to finish."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._pending:
+            self._queue.put((None, self._snapshot()))
+        self._queue.put(None)
+        self._writer.join(timeout=5)
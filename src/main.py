@@ -2,23 +2,51 @@
 # The main entry point for the Space Shooter game.
 # ==============================================================================
 
+import argparse
 import pygame
-from .settings import WINDOW_WIDTH, WINDOW_HEIGHT, CAPTION
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from .settings import (
+    WINDOW_WIDTH, WINDOW_HEIGHT, CAPTION, LOADER_WORKERS, RECORD_REPLAYS, TELEMETRY_ENABLED, RENDER_SCALE, DYNAMIC_RESOLUTION
+)
 from .assets import assets
 from .sounds import Sounds
 from .ui.menus import main_menu
+from .ui.splash import loading_screen
 from .high_score import HighScoreManager
+from .telemetry import telemetry
 
 def run():
     """Initializes pygame, loads assets, and starts the main menu loop."""
+    parser = argparse.ArgumentParser(description="Space Shooter")
+    parser.add_argument("--stress", action="store_true", help="play against thousands of meteors (needs NumPy)")
+    parser.add_argument("--record", action="store_true", help="save a replay of every finished round")
+    parser.add_argument("--telemetry", action="store_true", help="log session telemetry to telemetry/")
+    parser.add_argument("--render-scale", type=float, default=RENDER_SCALE,
+                        help="world resolution as a fraction of the window, e.g. 0.5")
+    parser.add_argument("--dynamic-resolution", action="store_true",
+                        help="lower the world resolution as needed to hold the frame budget")
+    args = parser.parse_args()
+    start = perf_counter()
+    if args.telemetry or TELEMETRY_ENABLED:
+        telemetry.start()
 
     # General setup
     pygame.init()
     display_surface = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
     pygame.display.set_caption(CAPTION)
 
-    # Load all game assets once
-    assets.init()
+    # Decode images and sounds on worker threads behind a loading screen.
+    # Deferred assets keep loading after the menu opens and are waited on when first used.
+    executor = ThreadPoolExecutor(LOADER_WORKERS, thread_name_prefix="loader")
+    sounds = Sounds(executor)
+    futures = assets.start_loading(executor)
+    first_frame = loading_screen(display_surface, futures + sounds.pending())
+    assets.finish_loading()
+    executor.shutdown(wait=False)
+    ready = perf_counter()
+    print(f"First frame after {(first_frame - start) * 1000:.0f} ms, ready after {(ready - start) * 1000:.0f} ms.")
+    telemetry.emit("loaded", first_frame_ms=round((first_frame - start) * 1000), ready_ms=round((ready - start) * 1000))
 
     # Set window icon if available
     try:
@@ -26,12 +54,12 @@ def run():
     except Exception:
         pass
 
-    # Initialize game sounds and high score manager
-    sounds = Sounds()
+    # Initialize high score manager
     high_score_manager = HighScoreManager()
 
     # Start the main menu loop, which will handle all sub-menus and the game itself.
-    main_menu(display_surface, sounds, high_score_manager)
+    main_menu(display_surface, sounds, high_score_manager, args.stress, args.record or RECORD_REPLAYS,
+              args.render_scale, args.dynamic_resolution or DYNAMIC_RESOLUTION)
 
 if __name__ == "__main__":
     run()
\ No newline at end of file
@@ -0,0 +1,177 @@
+# ==============================================================================
+# Music manager: decoded tracks cached in memory and played on reserved mixer
+# channels, so switching, pausing and resuming never touch the disk.
+# ==============================================================================
+
+import pygame
+from collections import OrderedDict
+from concurrent.futures import Future
+from .settings import MUSIC_CACHE_BYTES, MUSIC_CHANNELS, MUSIC_CROSSFADE_MS
+
+class MusicManager:
+    def __init__(self, cache_bytes=MUSIC_CACHE_BYTES, crossfade_ms=MUSIC_CROSSFADE_MS):
+        self.cache_bytes = cache_bytes
+        self.crossfade_ms = crossfade_ms
+        self._tracks = OrderedDict() # path -> Sound or Future, least recently used first
+        self._missing = set() # Tracks that failed to load, so they aren't retried from disk
+        self._volume = 1.0
+
+        # The first channels are kept for music, Sound.play never picks them for effects
+        pygame.mixer.set_reserved(MUSIC_CHANNELS)
+        self._channels = [pygame.mixer.Channel(i) for i in range(MUSIC_CHANNELS)]
+
+        # path -> [channel, seconds played before the last start, ticks at the last start or None if paused]
+        self._playing = {}
+        self.current = None
+
+        self.loads = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _size(sound):
+        """Bytes of decoded PCM held by a sound."""
+        frequency, size, channels = pygame.mixer.get_init()
+        return int(sound.get_length() * frequency) * channels * abs(size) // 8
+
+    def cache_usage(self):
+        """Returns the bytes held by the decoded tracks in the cache."""
+        return sum(self._size(track) for track in self._tracks.values() if not isinstance(track, Future))
+
+    def preload(self, path, executor=None):
+        """Decodes a track into the cache ahead of time, on the executor's threads if one is given.
+        Returns a future when loading in the background."""
+        if path in self._tracks or path in self._missing:
+            return None
+        if executor is None:
+            self._sound(path)
+            return None
+        future = executor.submit(pygame.mixer.Sound, path)
+        self._tracks[path] = future
+        return future
+
+    def _sound(self, path):
+        """Returns the decoded track, loading it on a cache miss. Returns None if it can't be loaded."""
+        if path in self._missing:
+            return None
+        track = self._tracks.get(path)
+        try:
+            if track is None:
+                track = pygame.mixer.Sound(path)
+                self.loads += 1
+            elif isinstance(track, Future):
+                track = track.result()
+                self.loads += 1
+        except (pygame.error, OSError) as e:
+            print(f"Error loading music: {e}")
+            self._tracks.pop(path, None)
+            self._missing.add(path)
+            return None
+
+        self._tracks[path] = track
+        self._tracks.move_to_end(path)
+        self._evict(keep=path)
+        return track
+
+    def _evict(self, keep=None):
+        """Drops least recently used tracks that aren't playing until the cache fits its cap."""
+        usage = self.cache_usage()
+        for path in list(self._tracks):
+            if usage <= self.cache_bytes:
+                break
+            track = self._tracks[path]
+            if path == keep or path in self._playing or isinstance(track, Future):
+                continue
+            usage -= self._size(track)
+            del self._tracks[path]
+            self.evictions += 1
+
+    def _free_channel(self):
+        """Returns a music channel that isn't playing or holding a paused track."""
+        busy = {entry[0] for entry in self._playing.values()}
+        for channel in self._channels:
+            if channel not in busy and not channel.get_busy():
+                return channel
+        # Every channel is still fading out, cut the oldest short
+        channel = next(channel for channel in self._channels if channel not in busy)
+        channel.stop()
+        return channel
+
+    def _fade_out(self, path):
+        """Fades a track out and forgets its position. Held tracks are silent already and just stop."""
+        channel, _, started = self._playing.pop(path)
+        if started is None:
+            channel.stop()
+        else:
+            channel.fadeout(self.crossfade_ms)
+
+    def play(self, path, loops=-1, hold=False):
+        """Crossfades to a track from its start.
+        With hold, the outgoing track is paused in place so resume() can continue it later.
+        Tracks held earlier are dropped."""
+        if path == self.current:
+            return # Already playing, keep it going without a gap
+
+        previous = self.current
+        for held in [p for p in self._playing if p != previous]:
+            self._fade_out(held)
+        if previous in self._playing:
+            if hold:
+                self._pause(previous)
+            else:
+                self._fade_out(previous)
+        self.current = None
+
+        sound = self._sound(path)
+        if sound is None:
+            return
+        channel = self._free_channel()
+        channel.set_volume(self._volume)
+        channel.play(sound, loops=loops, fade_ms=self.crossfade_ms)
+        self._playing[path] = [channel, 0.0, pygame.time.get_ticks()]
+        self.current = path
+
+    def _pause(self, path):
+        """Pauses a track in place and banks the time it has played."""
+        entry = self._playing[path]
+        entry[0].pause()
+        entry[1] += (pygame.time.get_ticks() - entry[2]) / 1000
+        entry[2] = None
+
+    def resume(self, path, loops=-1):
+        """Continues a held track where it was paused, or plays it from the start if it isn't held."""
+        entry = self._playing.get(path)
+        if entry is None or entry[2] is not None:
+            self.play(path, loops)
+            return
+
+        if self.current is not None:
+            self._fade_out(self.current)
+        entry[0].set_volume(self._volume)
+        entry[0].unpause()
+        entry[2] = pygame.time.get_ticks()
+        self._tracks.move_to_end(path)
+        self.current = path
+
+    def position(self, path=None):
+        """Seconds into the given track, or the current one, wrapped to its length. None if it isn't playing."""
+        path = path or self.current
+        entry = self._playing.get(path)
+        if entry is None:
+            return None
+        played = entry[1]
+        if entry[2] is not None:
+            played += (pygame.time.get_ticks() - entry[2]) / 1000
+        return played % max(self._tracks[path].get_length(), 1e-6)
+
+    def set_volume(self, volume):
+        """Sets the music volume for every track."""
+        self._volume = volume
+        for channel in self._channels:
+            channel.set_volume(volume)
+
+    def stop(self):
+        """Stops all music, held tracks included."""
+        for channel in self._channels:
+            channel.stop()
+        self._playing.clear()
+        self.current = None
@@ -0,0 +1,93 @@
+# ==============================================================================
+# Fixed-size ring buffers and hot-path frame timers.
+# ==============================================================================
+
+import csv
+from array import array
+from time import perf_counter
+from .settings import PERF_HISTORY_FRAMES
+
+class RingBuffer:
+    def __init__(self, size, typecode='d'):
+        self.size = size
+        self.values = array(typecode, [0]) * size # Preallocated, nothing is allocated when appending
+        self.index = 0
+        self.count = 0
+
+    def append(self, value):
+        self.values[self.index] = value
+        self.index = (self.index + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+
+    def add_to_latest(self, value):
+        self.values[self.index - 1] += value
+
+    def latest(self):
+        return self.values[self.index - 1] if self.count else 0
+
+    def last(self, n):
+        """Returns the newest n values, oldest first."""
+        n = min(n, self.count)
+        start = (self.index - n) % self.size
+        if start + n <= self.size:
+            return self.values[start:start + n].tolist()
+        return self.values[start:].tolist() + self.values[:self.index].tolist()
+
+    def mean(self, n=None):
+        values = self.last(self.count if n is None else n)
+        return sum(values) / len(values) if values else 0.0
+
+class FrameTimers:
+    def __init__(self, phases, counters=(), size=PERF_HISTORY_FRAMES):
+        self.phases = tuple(phases)
+        self.counters = tuple(counters)
+        self.time = RingBuffer(size) # Seconds since the timers were created
+        self.frame = RingBuffer(size) # Frame time in ms
+        self.buffers = {phase: RingBuffer(size) for phase in self.phases} # Phase costs in ms
+        self.counts = {name: RingBuffer(size, 'l') for name in self.counters}
+        self._created = perf_counter()
+        self._mark = self._created
+
+    def begin_frame(self, frame_ms, **counts):
+        """Records the frame time and the given counters, and starts timing the first phase."""
+        self._mark = perf_counter()
+        self.time.append(self._mark - self._created)
+        self.frame.append(frame_ms)
+
+        # Every phase gets a slot per frame, so phases that don't run stay aligned at zero
+        for buffer in self.buffers.values():
+            buffer.append(0.0)
+        for name, value in counts.items():
+            self.counts[name].append(value)
+
+    def mark(self):
+        """Restarts the phase clock without recording anything."""
+        self._mark = perf_counter()
+
+    def record(self, phase):
+        """Adds the time since the last mark to the given phase of the current frame."""
+        now = perf_counter()
+        self.buffers[phase].add_to_latest((now - self._mark) * 1000)
+        self._mark = now
+
+    def work_ms(self, phases=None):
+        """Returns the time spent in the given phases of the current frame, all of them by default, in ms."""
+        buffers = self.buffers
+        return sum(buffers[phase].latest() for phase in (self.phases if phases is None else phases))
+
+    def dump_csv(self, path, seconds):
+        """Writes the frames recorded during the last given number of seconds to a CSV file."""
+        times = self.time.last(self.time.count)
+        cutoff = times[-1] - seconds if times else 0
+        n = sum(1 for t in times if t >= cutoff)
+
+        columns = [self.frame.last(n)] + [self.buffers[p].last(n) for p in self.phases]
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(("time_s", "frame_ms") + tuple(f"{p}_ms" for p in self.phases) + self.counters)
+            counts = [self.counts[c].last(n) for c in self.counters]
+            for i, t in enumerate(times[len(times) - n:]):
+                row = [f"{t:.4f}"] + [f"{column[i]:.4f}" for column in columns]
+                writer.writerow(row + [column[i] for column in counts])
+        return n
@@ -0,0 +1,99 @@
+# ==============================================================================
+# Quality governor: steps through effect tiers on a moving frame time average,
+# with hysteresis so a borderline machine doesn't flap between two tiers.
+# ==============================================================================
+
+from typing import NamedTuple, Optional
+from .settings import (
+    QUALITY_TIERS, QUALITY_BUDGET_MS, QUALITY_RECOVER_MS, QUALITY_SMOOTHING_FRAMES, QUALITY_DEGRADE_FRAMES,
+    QUALITY_RECOVER_FRAMES, QUALITY_WARMUP_FRAMES
+)
+
+MAX_RECOVER_BACKOFF = 8 # Largest multiple of the recovery wait after repeated flaps
+
+class QualityTier(NamedTuple):
+    name: str
+    explosion_step: int # Use every nth explosion frame
+    skip_explosions: bool # Meteors vanish without an explosion, the player's death still has one
+    rotation_interval: int # Ticks between meteor image and mask rotations
+    confetti: bool # Confetti on the game over screen after a new high score
+    max_meteors: Optional[int] # Live meteor cap, spawns wait while it is reached
+
+class QualityGovernor:
+    def __init__(self, tiers=QUALITY_TIERS, budget_ms=QUALITY_BUDGET_MS, recover_ms=QUALITY_RECOVER_MS,
+                 smoothing_frames=QUALITY_SMOOTHING_FRAMES, degrade_frames=QUALITY_DEGRADE_FRAMES,
+                 recover_frames=QUALITY_RECOVER_FRAMES, warmup_frames=QUALITY_WARMUP_FRAMES, enabled=True):
+        self.tiers = [QualityTier(*tier) for tier in tiers]
+        self.budget_ms = budget_ms
+        self.recover_ms = recover_ms
+        self.degrade_frames = degrade_frames
+        self.recover_frames = recover_frames
+        self.warmup_frames = warmup_frames
+        self.enabled = enabled
+
+        self.tier = 0
+        self.average = None # Moving average of the frame time in ms
+        self._smoothing = 2 / (smoothing_frames + 1)
+        self._over = 0 # Frames in a row with the average over budget
+        self._under = 0 # Frames in a row with the average under the recovery line
+        self._backoff = 1 # Multiplies the recovery wait, doubled when a raise is undone straight away
+        self._since_raise = None # Frames since the last raise, None once it has held
+        self._warmup = warmup_frames # Frames still to be ignored
+
+        self.changes = 0
+
+    @property
+    def settings(self):
+        """The QualityTier in effect."""
+        return self.tiers[self.tier]
+
+    @property
+    def name(self):
+        return self.settings.name
+
+    def reset_average(self):
+        """Forgets the frame time history, e.g. after a menu, so it isn't judged on stale frames.
+        The next few frames are ignored too, since they are slowed by cold caches."""
+        self.average = None
+        self._over = self._under = 0
+        self._warmup = self.warmup_frames
+
+    def update(self, frame_ms):
+        """Feeds one frame time. Returns True if the tier changed."""
+        if not self.enabled:
+            return False
+        if self._warmup:
+            self._warmup -= 1
+            return False
+        if self.average is None:
+            self.average = frame_ms
+        else:
+            self.average += (frame_ms - self.average) * self._smoothing
+
+        if self._since_raise is not None:
+            self._since_raise += 1
+            if self._since_raise > self.recover_frames * self._backoff:
+                # The raise held, so the next one doesn't have to wait any longer than usual
+                self._since_raise = None
+                self._backoff = 1
+
+        self._over = self._over + 1 if self.average > self.budget_ms else 0
+        self._under = self._under + 1 if self.average < self.recover_ms else 0
+
+        if self._over >= self.degrade_frames and self.tier < len(self.tiers) - 1:
+            if self._since_raise is not None:
+                # Dropping right after a raise is a flap, wait longer before trying again
+                self._backoff = min(self._backoff * 2, MAX_RECOVER_BACKOFF)
+                self._since_raise = None
+            self._set_tier(self.tier + 1)
+            return True
+        if self._under >= self.recover_frames * self._backoff and self.tier > 0:
+            self._set_tier(self.tier - 1)
+            self._since_raise = 0
+            return True
+        return False
+
+    def _set_tier(self, tier):
+        self.tier = tier
+        self.changes += 1
+        self._over = self._under = 0
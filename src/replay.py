@@ -0,0 +1,261 @@
+# ==============================================================================
+# Compact binary replays: the seed, run-length encoded per-tick inputs, the
+# meteor spawn schedule and keyframes of the world state to seek to, re-run
+# headless to verify them.
+# Replay with: python -m src.replay FILE [--until TICK]
+# ==============================================================================
+
+import argparse
+import json
+import os
+import struct
+import sys
+import zlib
+from datetime import datetime
+from time import perf_counter
+from .settings import REPLAY_DIR, REPLAY_KEYFRAME_INTERVAL
+from .controls import InputState
+from .simulation import Simulation
+
+REPLAY_MAGIC = b"SSRP"
+REPLAY_VERSION = 3
+# magic, version, tick rate, flags, seed, ticks, final score, keyframe interval, keyframe count, inputs and spawns bytes
+HEADER = struct.Struct("<4sHHBQIIIIII")
+# tick, state checksum, input offset, ticks into that run, compressed state bytes. The states follow the keyframe table.
+KEYFRAME = struct.Struct("<IIIII")
+FLAG_STRESS = 1
+
+def pack_inputs(inputs):
+    """Packs an InputState into a bitfield, one bit per field."""
+    bits = 0
+    for i, pressed in enumerate(inputs):
+        if pressed:
+            bits |= 1 << i
+    return bits
+
+def unpack_inputs(bits):
+    return InputState(*(bool(bits >> i & 1) for i in range(len(InputState._fields))))
+
+def _write_varint(out, value):
+    """Appends an unsigned LEB128 integer."""
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _read_varint(data, offset):
+    """Reads an unsigned LEB128 integer, returning it and the offset after it."""
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+def state_checksum(simulation):
+    """A cheap fingerprint of the world, compared at keyframes to find where a replay diverged."""
+    player = simulation.player.rect
+    state = struct.pack("<IIIIff", simulation.tick, simulation.score, simulation.meteor_count,
+                        len(simulation.laser_sprites), player.x, player.y)
+    return zlib.crc32(state)
+
+class ReplayRecorder:
+    def __init__(self, simulation, keyframe_interval=REPLAY_KEYFRAME_INTERVAL):
+        self.simulation = simulation
+        self.keyframe_interval = keyframe_interval
+        self.seed = simulation.seed
+        self.runs = [] # [input bitfield, ticks]
+        self.spawns = [] # (tick, meteors spawned)
+        self.keyframes = [] # (tick, state checksum, compressed world state)
+
+    def record(self, inputs):
+        """Records the inputs of the tick the simulation just stepped."""
+        bits = pack_inputs(inputs)
+        if self.runs and self.runs[-1][0] == bits:
+            self.runs[-1][1] += 1
+        else:
+            self.runs.append([bits, 1])
+
+        simulation = self.simulation
+        if simulation.spawns:
+            self.spawns.append((simulation.tick, simulation.spawns))
+        if simulation.tick % self.keyframe_interval == 0:
+            state = zlib.compress(json.dumps(simulation.get_state(), separators=(",", ":")).encode())
+            self.keyframes.append((simulation.tick, state_checksum(simulation), state))
+
+    def encode(self):
+        """Returns the replay as bytes."""
+        simulation = self.simulation
+        inputs = bytearray()
+        run_offsets = [] # (first tick, byte offset) of every run
+        tick = 1
+        for bits, count in self.runs:
+            run_offsets.append((tick, len(inputs)))
+            inputs.append(bits)
+            _write_varint(inputs, count)
+            tick += count
+
+        # Spawn ticks are stored as gaps from the previous spawn
+        spawns = bytearray()
+        last_tick = 0
+        for tick, count in self.spawns:
+            _write_varint(spawns, tick - last_tick)
+            _write_varint(spawns, count)
+            last_tick = tick
+
+        # Each keyframe points at the input run holding the tick after it, so decoding can start there
+        keyframes = bytearray()
+        run = 0
+        for tick, checksum, state in self.keyframes:
+            while run + 1 < len(run_offsets) and run_offsets[run + 1][0] <= tick + 1:
+                run += 1
+            first_tick, offset = run_offsets[run] if run_offsets else (1, 0)
+            keyframes += KEYFRAME.pack(tick, checksum, offset, tick + 1 - first_tick, len(state))
+        keyframes += b"".join(state for _, _, state in self.keyframes)
+
+        header = HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, round(1 / simulation.dt),
+                             FLAG_STRESS if simulation.stress else 0, self.seed, simulation.tick, simulation.score,
+                             self.keyframe_interval, len(self.keyframes), len(inputs), len(spawns))
+        return header + inputs + spawns + keyframes
+
+    def save(self, path=None):
+        """Writes the replay, by default to a timestamped file in REPLAY_DIR, and returns its path."""
+        if path is None:
+            REPLAY_DIR.mkdir(parents=True, exist_ok=True)
+            path = REPLAY_DIR / f"replay_{datetime.now():%Y%m%d_%H%M%S}.ssr"
+        data = self.encode()
+        with open(path, "wb") as file:
+            file.write(data)
+        print(f"Saved a {self.simulation.tick} tick replay to {path} ({len(data)} bytes)")
+        return path
+
+class Replay:
+    def __init__(self, data):
+        (magic, version, self.tick_rate, flags, self.seed, self.ticks, self.score, self.keyframe_interval,
+         keyframe_count, inputs_length, spawns_length) = HEADER.unpack_from(data)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError("Not a replay file, or one from an incompatible version.")
+        self.stress = bool(flags & FLAG_STRESS)
+
+        start = HEADER.size
+        self._inputs = bytes(data[start:start + inputs_length])
+        start += inputs_length
+        self.spawns = {}
+        offset, end, tick = start, start + spawns_length, 0
+        while offset < end:
+            gap, offset = _read_varint(data, offset)
+            count, offset = _read_varint(data, offset)
+            tick += gap
+            self.spawns[tick] = count
+        self.keyframes = [KEYFRAME.unpack_from(data, end + i * KEYFRAME.size) for i in range(keyframe_count)]
+        self._states = []
+        start = end + keyframe_count * KEYFRAME.size
+        for keyframe in self.keyframes:
+            self._states.append(bytes(data[start:start + keyframe[4]]))
+            start += keyframe[4]
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as file:
+            return cls(file.read())
+
+    def keyframe_before(self, tick):
+        """Returns the index of the last keyframe at or before the given tick, or None."""
+        index = None
+        for i, keyframe in enumerate(self.keyframes):
+            if keyframe[0] > tick:
+                break
+            index = i
+        return index
+
+    def state(self, index):
+        """Returns the world state stored in a keyframe, for Simulation.set_state."""
+        return json.loads(zlib.decompress(self._states[index]))
+
+    def inputs(self, keyframe=None):
+        """Yields the InputState of every tick, from the first on or from the one after a keyframe."""
+        offset, skip = (0, 0) if keyframe is None else self.keyframes[keyframe][2:4]
+        data = self._inputs
+        while offset < len(data):
+            bits = data[offset]
+            count, offset = _read_varint(data, offset + 1)
+            state = unpack_inputs(bits)
+            for _ in range(count - skip):
+                yield state
+            skip = max(skip - count, 0)
+
+def play(replay, until=None, seek=False):
+    """Re-runs a replay as fast as possible and compares it with the recording. With seek, the run starts
+    from the last keyframe at or before until instead of the first tick.
+    Returns a dict with the outcome; 'ok' is False if the run diverged."""
+    until = replay.ticks if until is None else min(until, replay.ticks)
+    keyframes = {tick: checksum for tick, checksum, _, _, _ in replay.keyframes}
+    simulation = Simulation(replay.seed, replay.tick_rate, stress=replay.stress)
+    result = {"ticks": 0, "score": 0, "expected_score": replay.score, "ok": True, "diverged_at": None,
+              "start_tick": 0}
+
+    start = perf_counter()
+    keyframe = replay.keyframe_before(until) if seek else None
+    if keyframe is not None:
+        simulation.set_state(replay.state(keyframe))
+        result["start_tick"] = simulation.tick
+        if keyframes[simulation.tick] != state_checksum(simulation):
+            result["ok"] = False
+            result["diverged_at"] = simulation.tick
+    for inputs in replay.inputs(keyframe):
+        if simulation.tick >= until:
+            break
+        simulation.step(inputs)
+        tick = simulation.tick
+        diverged = simulation.spawns != replay.spawns.get(tick, 0)
+        if tick in keyframes and keyframes[tick] != state_checksum(simulation):
+            diverged = True
+        if diverged and result["ok"]:
+            result["ok"] = False
+            result["diverged_at"] = tick
+        if simulation.game_over:
+            break
+    elapsed = perf_counter() - start
+
+    result["ticks"] = simulation.tick
+    result["score"] = simulation.score
+    result["seconds"] = elapsed
+    if until == replay.ticks and (simulation.tick != replay.ticks or simulation.score != replay.score):
+        result["ok"] = False
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-run a recorded session headless and verify its final score.")
+    parser.add_argument("path", help="replay file to run")
+    parser.add_argument("--until", type=int, help="seek to the last keyframe before this tick and run up to it")
+    parser.add_argument("--from-start", action="store_true", help="re-run every tick instead of seeking")
+    args = parser.parse_args(argv)
+
+    # Headless: nothing is shown or played
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import pygame
+    from .assets import assets
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    assets.init(deferred=False)
+    assets.prepare_explosion_frames()
+
+    replay = Replay.load(args.path)
+    print(f"Seed {replay.seed}, {replay.ticks} ticks at {replay.tick_rate} Hz, score {replay.score}, "
+          f"{len(replay.keyframes)} keyframes{', stress mode' if replay.stress else ''}")
+    result = play(replay, args.until, seek=args.until is not None and not args.from_start)
+    ticks = result["ticks"] - result["start_tick"]
+    rate = ticks / result["seconds"] if result["seconds"] else 0
+    resumed = f" from the keyframe at tick {result['start_tick']}" if result["start_tick"] else ""
+    print(f"Replayed {ticks} ticks{resumed} in {result['seconds']:.2f} s ({rate:.0f} ticks/s), score {result['score']}")
+    if not result["ok"]:
+        print(f"Replay diverged from the recording (first mismatch at tick {result['diverged_at']})")
+        return 1
+    print("Replay matches the recording")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
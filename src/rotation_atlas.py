@@ -0,0 +1,61 @@
+# ==============================================================================
+# A shared, lazily filled cache of pre-rotated images and their collision masks.
+# ==============================================================================
+
+import pygame
+from collections import OrderedDict
+from .settings import METEOR_ROTATION_STEP, ROTATION_ATLAS_MAX_BYTES
+
+class RotationAtlas:
+    def __init__(self, surf, scales, step=METEOR_ROTATION_STEP, max_bytes=ROTATION_ATLAS_MAX_BYTES):
+        self.surf = surf
+        self.scales = scales
+        self.steps = max(1, round(360 / step)) # Number of distinct angles per size category
+        self.step = 360 / self.steps
+        self.max_bytes = max_bytes
+
+        # Entries are kept in least-recently-used order for eviction
+        self._entries = OrderedDict()
+        self._bytes = 0
+
+        # Cache stats
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, size_category, angle):
+        """Returns the (image, mask) pair for the given size category and angle."""
+        key = (size_category, round(angle / self.step) % self.steps)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        # Build the rotation on first use and remember it
+        self.misses += 1
+        image = pygame.transform.rotozoom(self.surf, key[1] * self.step, self.scales[size_category])
+        entry = (image, pygame.mask.from_surface(image))
+        self._entries[key] = entry
+        self._bytes += self._entry_size(image)
+        self._evict()
+        return entry
+
+    def _entry_size(self, image):
+        """Approximate memory used by an image and its one-bit mask."""
+        w, h = image.get_size()
+        return w * h * image.get_bytesize() + (w * h) // 8
+
+    def _evict(self):
+        """Drops the least recently used rotations until the atlas fits its memory cap."""
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, (image, _) = self._entries.popitem(last=False)
+            self._bytes -= self._entry_size(image)
+            self.evictions += 1
+
+    def memory_usage(self):
+        """Returns the approximate number of bytes held by the atlas."""
+        return self._bytes
+
+    def __len__(self):
+        return len(self._entries)
@@ -2,6 +2,8 @@
 # Pygame Game Constants and Configuration
 # ==============================================================================
 
+import os
+import sys
 from os.path import join
 from pathlib import Path
 
@@ -13,16 +15,96 @@ WINDOW_HEIGHT = 720
 CAPTION = "Space Shooter"
 STAR_COUNT = 25
 STAR_MIN_DISTANCE = 150
+STAR_LAYER_SPEEDS = (0,) # px / sec per starfield layer, add faster layers for parallax, e.g. (0, 15, 40)
 
 # Gameplay tuning
 FPS = 120
+SIM_TICK_RATE = 120 # Hz, fixed step of the simulation, independent of the frame rate
+MAX_CATCH_UP_STEPS = 5 # Most simulation ticks run in one frame before slow frames start dropping time
 PLAYER_SPEED = 300 # px / sec
 LASER_SPEED = 400 # ms
 SHOOT_COOLDOWN = 400 # ms
 METEOR_BASE_SPAWN = 500 # ms
 EXPLOSION_ANIMATION_SPEED = 25 # ms
+EXPLOSION_SCALES = {"small": 0.5, "normal": 1.0, "large": 1.5} # Scale factor per explosion size
 CONFETTI_ANIMATION_SPEED = 25 # ms
 
+# Meteors
+METEOR_SCALES = {"small": 0.5, "medium": 1, "large": 1.5} # Scale factor per size category
+METEOR_ROTATION_STEP = 3 # degrees between cached meteor rotations
+ROTATION_ATLAS_MAX_BYTES = 32 * 1024 * 1024 # Memory cap for cached meteor rotations
+
+# Object pools, largest number of released sprites kept for reuse. Live sprites aren't capped.
+LASER_POOL_MAX_IDLE = 64
+METEOR_POOL_MAX_IDLE = 256
+EXPLOSION_POOL_MAX_IDLE = 64
+
+# Stress mode, a NumPy meteor field with far more meteors than normal play
+STRESS_SPAWN_RATE = 2000 # meteors / sec
+STRESS_INVULNERABLE = True # Meteors don't kill the player, so the stress run keeps going
+
+# Collisions
+COLLISION_CELL_SIZE = 128 # px, side of a broadphase grid cell
+
+# Rendering
+DIRTY_RECT_RENDERING = False # Present only the areas that changed instead of the whole frame
+BATCHED_RENDERING = True # Draw each world layer with one fblits call (full-frame mode only)
+PREMULTIPLIED_ALPHA = False # Premultiply gameplay sprites at load time and draw them with BLEND_PREMULTIPLIED
+MENU_FPS = 60 # Frame cap for menu screens
+
+# Render resolution (full-frame mode only)
+RENDER_SCALE = 1.0 # World resolution as a fraction of the window, the HUD always draws at full size
+RENDER_SCALES = (1.0, 0.875, 0.75, 0.625, 0.5) # Steps that keep both sides whole pixels, down to 540x360
+SMOOTH_UPSCALE = False # Filter the world when scaling it to the window, costs twice as much as nearest neighbour
+DYNAMIC_RESOLUTION = False # Step through RENDER_SCALES to stay inside the budget, also enabled with --dynamic-resolution
+RENDER_BUDGET_MS = 1000 / FPS * 0.5 # Drawing and presenting time allowed before the resolution drops, leaving
+                                    # room for the update, collisions and the sleep
+RENDER_UPSCALE_HEADROOM = 0.6 # Fraction of the budget the work has to fall under before the resolution rises
+RESOLUTION_SETTLE_FRAMES = FPS // 2 # Frames averaged, and waited after a change, before the next step
+
+# Quality governor, sheds effects while frames run over budget (off in stress mode)
+QUALITY_GOVERNOR = True
+QUALITY_BUDGET_MS = 1000 / FPS * 1.2 # Average frame time above this drops a tier
+QUALITY_RECOVER_MS = 1000 / FPS * 1.05 # Average frame time below this raises a tier again
+QUALITY_SMOOTHING_FRAMES = FPS // 2 # Frames the moving average spans
+QUALITY_DEGRADE_FRAMES = FPS // 2 # Frames over budget before a tier is dropped
+QUALITY_RECOVER_FRAMES = FPS * 3 # Frames under the recovery line before a tier is raised, doubled after a flap
+QUALITY_WARMUP_FRAMES = FPS // 2 # Frames ignored after a round starts or resumes, while caches are still cold
+QUALITY_TIERS = (
+    # name, explosion frame step, skip meteor explosions, ticks between meteor rotations, confetti, meteor cap
+    ("full", 1, False, 1, True, None),
+    ("reduced", 2, False, 2, True, None),
+    ("low", 3, False, 4, False, 40),
+    ("minimal", 3, True, 8, False, 25),
+)
+MENU_IDLE_TIMEOUT = 500 # ms an idle menu sleeps waiting for input
+
+# Loading
+LOADER_WORKERS = 4 # Threads decoding images and sounds at startup
+
+# Text
+TEXT_CACHE_SIZE = 256 # Rendered text surfaces kept in memory
+
+# Performance overlay
+PERF_HISTORY_FRAMES = FPS * 30 # Frames kept in the timing ring buffers
+PERF_GRAPH_FRAMES = 240 # Frames shown in the overlay's frame time graph
+PERF_DUMP_SECONDS = 10 # Seconds of timings written by a CSV dump
+PERF_DUMP_DIR = Path("perf_dumps")
+
+# Replays
+RECORD_REPLAYS = False # Save a replay of every finished round, also enabled with --record
+REPLAY_DIR = Path("replays")
+REPLAY_KEYFRAME_INTERVAL = SIM_TICK_RATE * 5 # Ticks between keyframes
+
+# Telemetry
+TELEMETRY_ENABLED = False # Log session events to TELEMETRY_DIR, also enabled with --telemetry
+TELEMETRY_DIR = Path("telemetry")
+TELEMETRY_QUEUE_EVENTS = FPS * 60 # Events held in memory before new ones are dropped
+TELEMETRY_FLUSH_SECONDS = 1.0 # How often the writer drains the queue
+TELEMETRY_ROTATE_BYTES = 4 * 1024 * 1024 # Compressed bytes before a log file is rotated
+TELEMETRY_KEEP_FILES = 200 # Oldest log files are deleted beyond this
+TELEMETRY_STUTTER_MS = 2000 / FPS # Frames slower than two frame budgets count as stutter
+
 # Colors
 BG_COLOR = "#503b5c"
 ACCENT_COLOR = "#b297cc"
@@ -42,7 +124,17 @@ BUTTON_SPACE = 115
 BORDER_RADIUS = 25
 
 # Files
-HIGH_SCORE_FILE = Path(__file__).resolve().parent / "high_score.txt"
+def _user_data_dir(name):
+    """The per-user directory for saved state: %APPDATA% on Windows, $XDG_DATA_HOME or ~/.local/share elsewhere."""
+    if sys.platform == "win32" and os.environ.get("APPDATA"):
+        return Path(os.environ["APPDATA"]) / name
+    return Path(os.environ.get("XDG_DATA_HOME") or Path.home() / ".local" / "share") / name
+
+USER_DATA_DIR = _user_data_dir("space-shooter") # Created only once something is saved
+HIGH_SCORE_FILE = Path(__file__).resolve().parent / "high_score.txt" # Legacy single score, imported once
+LEADERBOARD_DIR = USER_DATA_DIR / "leaderboard"
+LEADERBOARD_SIZE = 100 # Runs kept on the leaderboard
+LEADERBOARD_COMPACT_EVERY = 500 # Logged runs between snapshots
 
 # Images
 STAR_IMAGE_PATH = join("images", "star.png")
@@ -52,12 +144,20 @@ PLAYER_IMAGE_PATH = join("images", "player.png")
 MUTE_IMAGE_PATH = join("images", "mute.png")
 EXPLOSION_FRAMES_PATH = join("images", "explosion")
 CONFETTI_FRAMES_PATH = join("images", "confetti")
+EXPLOSION_FRAME_COUNT = 21
+CONFETTI_FRAME_COUNT = 59
+ASSET_PACK_PATH = join("images", "assets.pack") # Built by: python -m src.asset_pack
+ASSET_PACK_RAW_LIMIT = 1 << 20 # Bigger images stay PNG-encoded inside the pack, except trimmed animation frames
+TRIM_RLE = True # RLE-accelerate sparse animation frames, only for frames drawn without blend flags
+TRIM_RLE_MAX_COVERAGE = 0.25 # Fraction of a trimmed frame's pixels that may be opaque for it to count as sparse
 
 # Fonts
 FONT_LARGE_PATH = join("images", "Oxanium-Bold.ttf")
 FONT_LARGE_SIZE = 70
 FONT_SMALL_PATH = join("images", "Oxanium-Bold.ttf")
 FONT_SMALL_SIZE = 35
+FONT_DEBUG_PATH = join("images", "Oxanium-Bold.ttf")
+FONT_DEBUG_SIZE = 16
 
 # Sounds
 DEFAULT_GAME_VOLUME = 0.1
@@ -68,4 +168,9 @@ DEATH_SOUND_PATH = "audio/death.mp3"
 MENU_MUSIC_PATH = "audio/menu_music.wav"
 GAME_MUSIC_PATH = "audio/game_music.wav"
 PAUSE_MUSIC_PATH = "audio/pause_music.wav"
-GAME_OVER_MUSIC = "audio/game_over_music.wav"
\ No newline at end of file
+GAME_OVER_MUSIC = "audio/game_over_music.wav"
+MUSIC_CACHE_BYTES = 96 * 1024 * 1024 # Decoded music kept in memory
+MUSIC_CHANNELS = 3 # Mixer channels reserved for music: playing, fading out and paused tracks. Effects use the ones after
+MUSIC_CROSSFADE_MS = 400
+SFX_CATEGORIES = {"alerts": (1, 3), "impacts": (4, 2), "weapons": (2, 1)} # category: (reserved channels, priority)
+SFX_SOUNDS = {"death": ("alerts", 1), "explosion": ("impacts", 4), "laser": ("weapons", 2)} # sound: (category, most voices at once)
\ No newline at end of file
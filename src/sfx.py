@@ -0,0 +1,108 @@
+# ==============================================================================
+# Sound effect scheduler: reserved channels per category, per-sound voice caps,
+# priority-based voice stealing and merging of duplicate triggers in a frame.
+# ==============================================================================
+
+import pygame
+from .settings import SFX_CATEGORIES, SFX_SOUNDS
+
+class SfxScheduler:
+    def __init__(self, sounds, first_channel=0, categories=SFX_CATEGORIES, sound_settings=SFX_SOUNDS):
+        self.sounds = sounds
+        self.sound_settings = sound_settings
+        self.priorities = {category: priority for category, (_, priority) in categories.items()}
+
+        # Give each category its own block of channels, reserved so Sound.play never picks them
+        total = first_channel + sum(count for count, _ in categories.values())
+        if pygame.mixer.get_num_channels() < total:
+            pygame.mixer.set_num_channels(total)
+        pygame.mixer.set_reserved(total)
+        self.channels = {}
+        index = first_channel
+        for category, (count, _) in categories.items():
+            self.channels[category] = [pygame.mixer.Channel(i) for i in range(index, index + count)]
+            index += count
+
+        # channel -> (sound name, ticks when it started)
+        self._voices = {}
+        self._queued = []
+
+        self.played = 0
+        self.merged = 0
+        self.stolen = 0
+        self.dropped = 0
+
+    def trigger(self, name):
+        """Queues a sound for this frame. Repeats of a sound already queued are merged into it."""
+        if name in self._queued:
+            self.merged += 1
+        else:
+            self._queued.append(name)
+
+    def flush(self):
+        """Plays the sounds queued this frame, most important first."""
+        queued = sorted(self._queued, key=lambda name: self.priorities[self.sound_settings[name][0]], reverse=True)
+        self._queued.clear()
+        for name in queued:
+            self._play(name)
+
+    def _active(self):
+        """Returns the voices still playing, forgetting the ones that finished."""
+        for channel in [channel for channel in self._voices if not channel.get_busy()]:
+            del self._voices[channel]
+        return self._voices
+
+    def _play(self, name):
+        try:
+            sound = getattr(self.sounds, name)
+        except Exception:
+            self.dropped += 1
+            return
+        category, max_voices = self.sound_settings[name]
+        voices = self._active()
+
+        # At the voice cap, the oldest instance of the same sound makes room
+        same = [channel for channel, (voice, _) in voices.items() if voice == name]
+        if len(same) >= max_voices:
+            channel = min(same, key=lambda channel: voices[channel][1])
+            self.stolen += 1
+        else:
+            channel = self._free_channel(category) or self._steal(category)
+            if channel is None:
+                self.dropped += 1
+                return
+
+        channel.play(sound)
+        voices[channel] = (name, pygame.time.get_ticks())
+        self.played += 1
+
+    def _lower(self, category):
+        """Categories with a lower priority than this one, lowest first."""
+        priority = self.priorities[category]
+        return sorted((other for other in self.channels if self.priorities[other] < priority), key=self.priorities.get)
+
+    def _free_channel(self, category):
+        """Returns an idle channel of this category, or borrows one from a lower priority category."""
+        for other in [category, *self._lower(category)]:
+            for channel in self.channels[other]:
+                if channel not in self._voices:
+                    return channel
+        return None
+
+    def _steal(self, category):
+        """Cuts the oldest sound of lower priority than this category. Returns None if there is none."""
+        candidates = [channel for channel, (name, _) in self._voices.items()
+                      if self.priorities[self.sound_settings[name][0]] < self.priorities[category]]
+        if not candidates:
+            return None
+        self.stolen += 1
+        return min(candidates, key=lambda channel: (self.priorities[self.sound_settings[self._voices[channel][0]][0]],
+                                                    self._voices[channel][1]))
+
+    @property
+    def voices(self):
+        """Number of sound effects playing right now."""
+        return len(self._active())
+
+    def stats(self):
+        return {"played": self.played, "merged": self.merged, "stolen": self.stolen, "dropped": self.dropped}
@@ -0,0 +1,309 @@
+# ==============================================================================
+# The headless game simulation: world state advanced in ticks from explicit input.
+# ==============================================================================
+
+import pygame
+import math
+import random
+from .settings import (
+    METEOR_BASE_SPAWN, SIM_TICK_RATE, LASER_POOL_MAX_IDLE, METEOR_POOL_MAX_IDLE, EXPLOSION_POOL_MAX_IDLE,
+    STRESS_SPAWN_RATE, STRESS_INVULNERABLE
+)
+from .assets import assets
+from .controls import InputState
+from .collision import SpatialHash, collide_circle_mask
+from .sprites.player import Player
+from .sprites.meteor import Meteor
+from .sprites.laser import Laser
+from .sprites.explosion import AnimatedExplosion
+from .sprites.pool import SpritePool
+from .sprites.meteor_field import MeteorField
+
+class Simulation:
+    def __init__(self, seed=None, tick_rate=SIM_TICK_RATE, timers=None, stress=False):
+        self.dt = 1 / tick_rate # Length of a fixed tick in seconds
+        self.timers = timers # Optional FrameTimers receiving the update and collisions phases
+
+        # Stress mode swaps the meteor sprites for a vectorized meteor field
+        self.stress = stress
+        self.meteor_field = MeteorField(assets.meteor_rotations) if stress else None
+        self.invulnerable = stress and STRESS_INVULNERABLE
+
+        # Sprite groups
+        self.all_sprites = pygame.sprite.Group()
+        self.meteor_sprites = pygame.sprite.Group()
+        self.laser_sprites = pygame.sprite.Group()
+        self.explosion_sprites = pygame.sprite.Group()
+
+        self.broadphase = SpatialHash()
+
+        # Pools recycle the sprites that are created and destroyed all the time
+        laser_mask = pygame.mask.from_surface(assets.laser_surf)
+        self.laser_pool = SpritePool(lambda groups, pos: Laser(assets.laser_surf, pos, groups, laser_mask),
+                                     (self.all_sprites, self.laser_sprites), LASER_POOL_MAX_IDLE)
+        self.meteor_pool = SpritePool(lambda groups, rng: Meteor(assets.meteor_rotations, groups, rng),
+                                      (self.all_sprites, self.meteor_sprites), METEOR_POOL_MAX_IDLE)
+        self.explosion_pool = SpritePool(lambda groups, frames, pos: AnimatedExplosion(frames, pos, groups),
+                                         (self.all_sprites, self.explosion_sprites), EXPLOSION_POOL_MAX_IDLE)
+
+        # Names of the sounds triggered during the last step, played by whoever drives the simulation
+        self.sound_events = []
+
+        # Quality settings, lowered by the game's quality governor under load. The defaults keep runs reproducible.
+        self.explosion_step = 1
+        self.skip_explosions = False
+        self.rotation_interval = 1
+        self.max_meteors = None
+
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        """Clears the world and starts a new round from the given seed."""
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.rng = random.Random(self.seed)
+
+        # Hand the sprites of the last round back to their pools
+        for sprite in self.laser_sprites.sprites() + self.meteor_sprites.sprites() + self.explosion_sprites.sprites():
+            sprite.release()
+        self.all_sprites.empty()
+        self.sound_events.clear()
+        if self.meteor_field is not None:
+            self.meteor_field.reset(self.rng.randrange(2 ** 32))
+
+        self.player = Player(self.all_sprites, assets.player_surf, self.laser_pool,
+                             lambda: self.sound_events.append('laser'))
+
+        # Round state
+        self.tick = 0
+        self.score = 0
+        self.elapsed_time = 0
+        self.game_over = False
+
+        # Meteor spawn timer, in ms, and the meteors spawned during the last tick
+        self.spawn_timer = 0
+        self.spawns = 0
+        self.spawn_interval = self._calculate_spawn_rate()
+
+    # Function to calculate spawn rate based on score
+    # The spawn rate decreases (meteors spawn faster) as the player's score increases
+    def _calculate_spawn_rate(self) -> int:
+        """Return spawn interval in ms. Fewer ms = more meteors.
+        Uses a gentle logarithmic curve so difficulty ramps smoothly."""
+        # Use a diminishing returns curve
+        interval = METEOR_BASE_SPAWN - int(200 * (math.log1p(self.score) / math.log1p(100)))
+        return max(100, interval)
+
+    def set_quality(self, explosion_step=1, skip_explosions=False, rotation_interval=1, max_meteors=None):
+        """Applies a quality tier's effect settings. Meteors already in flight pick up the new rotation interval."""
+        self.explosion_step = explosion_step
+        self.skip_explosions = skip_explosions
+        self.max_meteors = max_meteors
+        if rotation_interval != self.rotation_interval:
+            self.rotation_interval = rotation_interval
+            for meteor in self.meteor_sprites:
+                meteor.rotation_interval = rotation_interval
+
+    def _explode(self, size, pos, optional=True):
+        """Starts an explosion. Optional ones, for meteors, are skipped at the lowest quality tiers."""
+        if optional and self.skip_explosions:
+            return
+        self.explosion_pool.acquire(assets.get_explosion_frames(size, self.explosion_step), pos)
+
+    @property
+    def meteor_count(self):
+        return len(self.meteor_field) if self.meteor_field is not None else len(self.meteor_sprites)
+
+    def spawn_meteor(self):
+        """Spawns a meteor using the simulation's random generator."""
+        if self.meteor_field is not None:
+            return self.meteor_field.spawn()
+        meteor = self.meteor_pool.acquire(self.rng)
+        meteor.rotation_interval = self.rotation_interval
+        return meteor
+
+    def _update_spawn_timer(self, dt):
+        """Spawns a meteor whenever the spawn interval has elapsed."""
+        self.spawn_timer += dt * 1000
+        self.spawns = 0
+        room = None if self.max_meteors is None else self.max_meteors - self.meteor_count
+        if self.meteor_field is not None:
+            # Stress mode spawns at a fixed, much higher rate
+            count = int(self.spawn_timer * STRESS_SPAWN_RATE / 1000)
+            if room is not None and count > room:
+                # At the cap the backlog is dropped instead of arriving in one burst later
+                count = max(room, 0)
+                self.spawn_timer = count * 1000 / STRESS_SPAWN_RATE
+            self.meteor_field.spawn(count)
+            self.spawn_timer -= count * 1000 / STRESS_SPAWN_RATE
+            self.spawns = count
+        elif self.spawn_timer >= self.spawn_interval:
+            if room is not None and room <= 0:
+                # Back-pressure: the next meteor waits until one leaves, then spawns straight away
+                self.spawn_timer = self.spawn_interval
+                return
+            self.spawn_meteor()
+            self.spawns = 1
+            self.spawn_timer = 0
+            self.spawn_interval = self._calculate_spawn_rate() # Reset timer
+
+    def get_state(self):
+        """Returns the whole world as JSON-ready values, for replay keyframes. Sprites are listed in drawing
+        order, which is also the order they update and collide in, so a restored world plays out the same."""
+        sprites = []
+        for sprite in self.all_sprites:
+            if sprite in self.meteor_sprites:
+                sprites.append(["meteor", sprite.get_state()])
+            elif sprite in self.laser_sprites:
+                sprites.append(["laser", sprite.get_state()])
+            elif sprite in self.explosion_sprites:
+                sprites.append(["explosion", assets.explosion_frames_key(sprite.frames), sprite.get_state()])
+        version, internal, gauss = self.rng.getstate()
+        return {
+            "seed": self.seed, "tick": self.tick, "score": self.score, "elapsed_time": self.elapsed_time,
+            "game_over": self.game_over, "spawn_timer": self.spawn_timer, "spawn_interval": self.spawn_interval,
+            "spawns": self.spawns, "rng": [version, internal, gauss],
+            "quality": [self.explosion_step, self.skip_explosions, self.rotation_interval, self.max_meteors],
+            "player": self.player.get_state() if self.player.alive() else None, "sprites": sprites,
+            "field": self.meteor_field.get_state() if self.meteor_field is not None else None,
+        }
+
+    def set_state(self, state):
+        """Puts the world back in a state from get_state(), pooled sprites included."""
+        self.reset(state["seed"])
+        explosion_step, skip_explosions, rotation_interval, max_meteors = state["quality"]
+        self.set_quality(explosion_step, skip_explosions, rotation_interval, max_meteors)
+        for name in ("tick", "score", "elapsed_time", "game_over", "spawn_timer", "spawn_interval", "spawns"):
+            setattr(self, name, state[name])
+
+        if state["player"] is None:
+            self.player.kill()
+        else:
+            self.player.set_state(state["player"])
+        scratch = random.Random(0) # Meteors are rolled from this, then overwritten, so self.rng isn't touched
+        for entry in state["sprites"]:
+            kind = entry[0]
+            if kind == "meteor":
+                self.meteor_pool.acquire(scratch).set_state(entry[1])
+            elif kind == "laser":
+                self.laser_pool.acquire((0, 0)).set_state(entry[1])
+            else:
+                frames = assets.get_explosion_frames(*entry[1])
+                self.explosion_pool.acquire(frames, (0, 0)).set_state(entry[2])
+        if state["field"] is not None:
+            self.meteor_field.set_state(state["field"])
+
+        version, internal, gauss = state["rng"]
+        self.rng.setstate((version, tuple(internal), gauss))
+
+    def update(self, inputs, dt):
+        """Advances time, spawning and sprite movement for one tick."""
+        self.tick += 1
+        self.elapsed_time += dt
+        self.score = int(self.elapsed_time)
+
+        self._update_spawn_timer(dt)
+        self.player.controls = inputs
+        self._remember_positions()
+        self.all_sprites.update(dt)
+        if self.meteor_field is not None:
+            self.meteor_field.update(dt)
+
+    def _remember_positions(self):
+        """Keeps every moving sprite's center from before the tick, so frames drawn between ticks can interpolate.
+        Explosions stand still, their rects only shift with the trimmed frames, so they aren't interpolated."""
+        for group in (self.meteor_sprites, self.laser_sprites):
+            for sprite in group:
+                sprite.previous_center = sprite.rect.center
+        self.player.previous_center = self.player.rect.center
+
+    def _kill_player(self):
+        """Blows up the player's ship."""
+        self.sound_events.append('death')
+
+        # Trigger explosion animation at player position
+        self._explode('large', self.player.rect.center, optional=False)
+        self.player.kill()
+
+    def _field_collisions(self):
+        """Collisions against the meteor field. Return True if the player died this tick."""
+        field = self.meteor_field
+        if self.player.alive() and not self.invulnerable:
+            collided = field.collide(self.player)
+            if collided:
+                field.kill(collided)
+                self._kill_player()
+                return True
+
+        for laser in self.laser_sprites.sprites():
+            hits = field.collide(laser)
+            if hits:
+                meteor = hits[0]
+                self._explode(field.size_category(meteor), field.center(meteor))
+                field.kill(hits)
+                laser.release()
+                self.sound_events.append('explosion')
+        return False
+
+    def collisions(self):
+        """Return True if the player died this tick."""
+        if self.meteor_field is not None:
+            return self._field_collisions()
+
+        # Bucket meteors into the grid once, then only test sprites sharing a cell
+        self.broadphase.rebuild(self.meteor_sprites)
+
+        # Player-Meteor collisions
+        if self.player.alive():
+            collided = [meteor for meteor in self.broadphase.query(self.player.rect)
+                        if collide_circle_mask(self.player, meteor)]
+            if collided:
+                for meteor in collided:
+                    meteor.release()
+                self._kill_player()
+                return True
+
+        # Laser-Meteor collisions
+        hits = {}
+        for laser, meteor in self.broadphase.pairs(self.laser_sprites):
+            # Skip meteors already destroyed by another laser this tick
+            if meteor.alive() and collide_circle_mask(laser, meteor):
+                meteor.release()
+                hits.setdefault(laser, meteor)
+
+        for laser, meteor in hits.items():
+            laser.release()
+            self._explode(meteor.size_category, meteor.rect.center)
+            self.sound_events.append('explosion')
+        return False
+
+    def step(self, inputs=InputState(), dt=None):
+        """Advances the world by one tick. Returns True once the player has died."""
+        dt = self.dt if dt is None else dt
+        self.sound_events.clear()
+
+        timers = self.timers
+        self.update(inputs, dt)
+        if timers:
+            timers.record('update')
+        died = self.collisions()
+        if timers:
+            timers.record('collisions')
+
+        if died or not self.player.alive():
+            self.game_over = True
+        return self.game_over
+
+    def step_aftermath(self, dt=None):
+        """Keeps the world moving after the player died, until the explosions finish.
+        Returns True while there are still explosions playing."""
+        dt = self.dt if dt is None else dt
+        self.sound_events.clear()
+
+        self._remember_positions()
+        self.all_sprites.update(dt)
+        self.explosion_sprites.update(dt)
+        if self.meteor_field is not None:
+            self.meteor_field.update(dt)
+        if self.timers:
+            self.timers.record('update')
+        return bool(self.explosion_sprites)
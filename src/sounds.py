@@ -3,17 +3,30 @@
 # ==============================================================================
 
 import pygame
+from concurrent.futures import Future
+from .music import MusicManager
+from .sfx import SfxScheduler
 from .settings import (
     DEFAULT_GAME_VOLUME, DEFAULT_MENU_VOLUME, LASER_SOUND_PATH, EXPLOSION_SOUND_PATH,
-    DEATH_SOUND_PATH, MENU_MUSIC_PATH, GAME_MUSIC_PATH, PAUSE_MUSIC_PATH, GAME_OVER_MUSIC
+    DEATH_SOUND_PATH, MENU_MUSIC_PATH, GAME_MUSIC_PATH, PAUSE_MUSIC_PATH, GAME_OVER_MUSIC, MUSIC_CHANNELS
 )
 
 class Sounds:
-    def __init__(self):
-        # Short sounds
-        self.laser = pygame.mixer.Sound(LASER_SOUND_PATH)
-        self.explosion = pygame.mixer.Sound(EXPLOSION_SOUND_PATH)
-        self.death = pygame.mixer.Sound(DEATH_SOUND_PATH)
+    def __init__(self, executor=None):
+        # Short sounds, decoded on the executor's threads when one is given
+        self._effects = {}
+        for name, path in (("laser", LASER_SOUND_PATH), ("explosion", EXPLOSION_SOUND_PATH), ("death", DEATH_SOUND_PATH)):
+            self._effects[name] = executor.submit(pygame.mixer.Sound, path) if executor else pygame.mixer.Sound(path)
+
+        # Music tracks are decoded once and then switched in memory.
+        # Only the menu track is needed before the first screen.
+        self.music = MusicManager()
+        self._menu_music = self.music.preload(MENU_MUSIC_PATH, executor)
+        for path in (GAME_MUSIC_PATH, PAUSE_MUSIC_PATH, GAME_OVER_MUSIC):
+            self.music.preload(path, executor)
+
+        # Gameplay effects go through the scheduler, on the channels after the music ones
+        self.sfx = SfxScheduler(self, first_channel=MUSIC_CHANNELS)
 
         # Sounds stats
         self._muted = False
@@ -21,6 +34,32 @@ class Sounds:
         self._menu_volume = DEFAULT_MENU_VOLUME
         self._display_volume = self._game_volume
 
+    def _effect(self, name):
+        """Returns a short sound, waiting for it to finish decoding on first use."""
+        effect = self._effects[name]
+        if isinstance(effect, Future):
+            effect = self._effects[name] = effect.result()
+        return effect
+
+    @property
+    def laser(self):
+        return self._effect("laser")
+
+    @property
+    def explosion(self):
+        return self._effect("explosion")
+
+    @property
+    def death(self):
+        return self._effect("death")
+
+    def pending(self):
+        """Returns the futures of sounds that are still being decoded and needed right away."""
+        pending = [effect for effect in self._effects.values() if isinstance(effect, Future)]
+        if self._menu_music is not None and not self._menu_music.done():
+            pending.append(self._menu_music)
+        return pending
+
     def set_volume(self, volume):
         """Sets the volume for all sound effects and music."""
         self._game_volume = volume
@@ -28,7 +67,7 @@ class Sounds:
         self.laser.set_volume(self._game_volume)
         self.explosion.set_volume(self._game_volume)
         self.death.set_volume(self._game_volume)
-        pygame.mixer.music.set_volume(self._game_volume)
+        self.music.set_volume(self._game_volume)
         return volume
 
     def get_game_volume(self):
@@ -38,7 +77,7 @@ class Sounds:
     def set_menu_volume(self, volume):
         """Sets the menu volume."""
         self._menu_volume = volume
-        pygame.mixer.music.set_volume(self._menu_volume)
+        self.music.set_volume(self._menu_volume)
 
     def get_menu_volume(self):
         """Returns the current menu volume."""
@@ -68,22 +107,21 @@ class Sounds:
         else:
             self.set_volume(volume)
 
-    def play_music(self, music_path, loop=-1, start=0.0):
-        """Loads and plays music from a given path."""
-        try:
-            pygame.mixer.music.load(music_path)
-            pygame.mixer.music.play(loops=loop, start=start)
-        except pygame.error as e:
-            print(f"Error playing music: {e}")
+    def play_music(self, music_path, loop=-1, hold=False):
+        """Crossfades to a music track. With hold, the current track is paused so it can be resumed later."""
+        self.music.play(music_path, loop, hold)
 
     def play_menu_music(self, loop=-1):
         self.play_music(MENU_MUSIC_PATH, loop)
 
-    def play_game_music(self, start=0.0, loop=-1):
-        self.play_music(GAME_MUSIC_PATH, loop, start)
+    def play_game_music(self, loop=-1):
+        self.play_music(GAME_MUSIC_PATH, loop)
+
+    def resume_game_music(self, loop=-1):
+        self.music.resume(GAME_MUSIC_PATH, loop)
 
     def play_pause_music(self, loop=-1):
-        self.play_music(PAUSE_MUSIC_PATH, loop)
+        self.play_music(PAUSE_MUSIC_PATH, loop, hold=True)
 
     def play_game_over_music(self, loop=-1):
-        self.play_music(GAME_OVER_MUSIC, loop)
\ No newline at end of file
+        self.play_music(GAME_OVER_MUSIC, loop)
@@ -8,17 +8,24 @@ from ..settings import WINDOW_WIDTH, WINDOW_HEIGHT, CONFETTI_ANIMATION_SPEED
 class AnimatedConfetti(pygame.sprite.Sprite):
     def __init__(self, frames, groups):
         super().__init__(groups)
-        self.frames = frames
+        self.frames = frames # Trimmed frames, only the area with confetti in it is drawn
         self.frame_index = 0
-        self.image = self.frames[self.frame_index]
-        self.rect = self.image.get_frect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2))
+        self._show(0)
+
+    def _show(self, index):
+        """Switches to a frame, placing its trimmed image where it sits on the full canvas."""
+        frame = self.frames[index]
+        self.image = frame.image
+        self.rect = frame.rect((WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2))
 
     def update(self, dt):
         """Updates the animation frame based on time."""
         self.frame_index += CONFETTI_ANIMATION_SPEED * dt
 
         # Check if the animation is still running
-        if int(self.frame_index) < len(self.frames):
-            self.image = self.frames[int(self.frame_index)]
+        index = int(self.frame_index)
+        if index < len(self.frames):
+            if self.image is not self.frames[index].image:
+                self._show(index)
         else:
             self.kill() # Remove explosion after it finishes
\ No newline at end of file
@@ -2,30 +2,43 @@
 # AnimatedExplosion class for explosion animations when objects are destroyed.
 # ==============================================================================
 
-import pygame
-from ..settings import EXPLOSION_ANIMATION_SPEED
+from ..settings import EXPLOSION_ANIMATION_SPEED, EXPLOSION_FRAME_COUNT
+from .pool import PooledSprite
 
-class AnimatedExplosion(pygame.sprite.Sprite):
-    def __init__(self, frames, pos, groups, size):
+class AnimatedExplosion(PooledSprite):
+    def __init__(self, frames, pos, groups):
         super().__init__(groups)
-        self.frames = [self._scale_frame(f, size) for f in frames] # Scale frames based on size
+        self.spawn(frames, pos)
+
+    def spawn(self, frames, pos):
+        """Restarts the animation at the given position, also used when it is reused from a pool."""
+        self.frames = frames # Pre-scaled, trimmed frames shared by every explosion of this size
         self.frame_index = 0
-        self.image = self.frames[self.frame_index]
-        self.rect = self.image.get_frect(center=pos)
+        self.speed = EXPLOSION_ANIMATION_SPEED * len(frames) / EXPLOSION_FRAME_COUNT # Same duration with fewer frames
+        self.center = pos
+        self._show(0)
+
+    def _show(self, index):
+        """Switches to a frame, placing its trimmed image where it sits on the full canvas."""
+        frame = self.frames[index]
+        self.image = frame.image
+        self.rect = frame.rect(self.center)
 
-    def _scale_frame(self, frame, size):
-        """Scales explosion frames based on the size of the explosion."""
-        scale_map = {'small': 0.5, 'large': 1.5, 'normal': 1.0}
-        scale_factor = scale_map.get(size, 1.0)
+    def get_state(self):
+        """Returns the animation's progress and position, for replay keyframes. The frames are up to the owner."""
+        return [self.frame_index, self.center[0], self.center[1]]
 
-        w, h = frame.get_size()
-        new_size = (int(w * scale_factor), int(h * scale_factor))
-        return pygame.transform.scale(frame, new_size)
+    def set_state(self, state):
+        self.frame_index, x, y = state
+        self.center = (x, y)
+        self._show(min(int(self.frame_index), len(self.frames) - 1))
 
     def update(self, dt):
         """Updates the animation frame based on time."""
-        self.frame_index += EXPLOSION_ANIMATION_SPEED * dt
-        if int(self.frame_index) < len(self.frames):
-            self.image = self.frames[int(self.frame_index)]
+        self.frame_index += self.speed * dt
+        index = int(self.frame_index)
+        if index < len(self.frames):
+            if self.image is not self.frames[index].image:
+                self._show(index)
         else:
-            self.kill() # Remove explosion after it finishes
\ No newline at end of file
+            self.release() # Remove explosion after it finishes
@@ -4,16 +4,31 @@
 
 import pygame
 from ..settings import LASER_SPEED
+from ..collision import bounding_radius
+from .pool import PooledSprite
 
-class Laser(pygame.sprite.Sprite):
-    def __init__(self, surf, pos, groups):
+class Laser(PooledSprite):
+    def __init__(self, surf, pos, groups, mask=None):
         super().__init__(groups)
         self.image = surf
-        self.rect = self.image.get_rect(midbottom=pos) # Position laser at player's top
+        self.mask = mask if mask is not None else pygame.mask.from_surface(surf) # Shared mask avoids rebuilding it per collision test
+        self.radius = bounding_radius(surf)
         self.speed = LASER_SPEED
+        self.spawn(pos)
+
+    def spawn(self, pos):
+        """Places the laser at the given position, also used when it is reused from a pool."""
+        self.rect = self.image.get_frect(midbottom=pos) # Position laser at player's top
+
+    def get_state(self):
+        """Returns the laser's position, for replay keyframes."""
+        return [self.rect.x, self.rect.y]
+
+    def set_state(self, state):
+        self.rect.topleft = state
 
     def update(self, dt):
         """Moves the laser up the screen and removes it when it goes off-screen."""
-        self.rect.y -= int(self.speed * dt)
+        self.rect.y -= self.speed * dt
         if self.rect.bottom < 0:
-            self.kill()
\ No newline at end of file
+            self.release()
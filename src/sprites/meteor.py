@@ -3,36 +3,58 @@
 # ==============================================================================
 
 import pygame
-from random import randint, uniform
+import random
 from ..settings import WINDOW_WIDTH, WINDOW_HEIGHT
+from ..collision import bounding_radius
+from .pool import PooledSprite
 
-class Meteor(pygame.sprite.Sprite):
-    def __init__(self, surf, groups):
+class Meteor(PooledSprite):
+    def __init__(self, atlas, groups, rng=random):
         super().__init__(groups)
-        self.original_image = surf # Save the original image for rotation
-        self.image = surf
+        self.atlas = atlas # Shared cache of rotated images and masks
+        self.spawn(rng)
 
-        self.rect = self.image.get_rect(midbottom=(randint(0, WINDOW_WIDTH), 0)) # Random spawn on top
-        self.direction = pygame.math.Vector2(uniform(-0.5, 0.5), 1) # Meteor's initial movement direction
+    def spawn(self, rng=random):
+        """Rolls a new size, speed and spawn position, also used when the meteor is reused from a pool."""
+        spawn_x = rng.randint(0, WINDOW_WIDTH) # Random spawn on top
+        self.direction = pygame.math.Vector2(rng.uniform(-0.5, 0.5), 1) # Meteor's initial movement direction
         self.rotation = 0 # Rotation angle of the meteor
+        self.rotation_interval = 1 # Ticks between image and mask rotations, raised by the quality governor
+        self._rotation_wait = 0
+        self._image_rotation = 0 # Rotation the current image and mask were taken at
 
         # Determine the size and properties of the meteor based on random chance
-        chance = randint(1, 100)
+        chance = rng.randint(1, 100)
         if chance <= 25:
             self.size_category = "small"
-            self.scale_factor = 0.5
-            self.speed = randint(500, 600)
-            self.rotation_speed = randint(70, 100)
+            self.speed = rng.randint(500, 600)
+            self.rotation_speed = rng.randint(70, 100)
         elif chance <= 50:  # Ensures a distinct second 25% range
             self.size_category = "large"
-            self.scale_factor = 1.5
-            self.speed = randint(300, 400)
-            self.rotation_speed = randint(10, 40)
+            self.speed = rng.randint(300, 400)
+            self.rotation_speed = rng.randint(10, 40)
         else:
             self.size_category = "medium"
-            self.scale_factor = 1
-            self.speed = randint(400, 500)
-            self.rotation_speed = randint(40, 70)
+            self.speed = rng.randint(400, 500)
+            self.rotation_speed = rng.randint(40, 70)
+
+        self.image, self.mask = self.atlas.get(self.size_category, self.rotation)
+        self.rect = self.image.get_frect(midbottom=(spawn_x, 0))
+        self.radius = bounding_radius(self.atlas.surf, self.atlas.scales[self.size_category]) # Same for every rotation
+
+    def get_state(self):
+        """Returns everything needed to put the meteor back where it is, for replay keyframes."""
+        r = self.rect
+        return [self.size_category, r.x, r.y, r.w, r.h, self.direction.x, self.direction.y, self.speed, self.rotation,
+                self.rotation_speed, self.rotation_interval, self._rotation_wait, self._image_rotation]
+
+    def set_state(self, state):
+        (self.size_category, x, y, w, h, dx, dy, self.speed, self.rotation, self.rotation_speed,
+         self.rotation_interval, self._rotation_wait, self._image_rotation) = state
+        self.direction = pygame.math.Vector2(dx, dy)
+        self.image, self.mask = self.atlas.get(self.size_category, self._image_rotation)
+        self.rect = pygame.FRect(x, y, w, h)
+        self.radius = bounding_radius(self.atlas.surf, self.atlas.scales[self.size_category])
 
     def update(self, dt):
         """Moves the meteor down the screen and removes it when it goes off-screen."""
@@ -40,9 +62,13 @@ class Meteor(pygame.sprite.Sprite):
         # Move meteor and rotate it
         self.rect.center += self.direction * self.speed * dt
         self.rotation += self.rotation_speed * dt
-        self.image = pygame.transform.rotozoom(self.original_image, self.rotation, self.scale_factor)
-        self.rect = self.image.get_frect(center=self.rect.center)
+        self._rotation_wait -= 1
+        if self._rotation_wait <= 0:
+            self._rotation_wait = self.rotation_interval
+            self._image_rotation = self.rotation
+            self.image, self.mask = self.atlas.get(self.size_category, self.rotation)
+            self.rect = self.image.get_frect(center=self.rect.center)
 
         # Kill meteor if it goes off-screen
         if self.rect.top >= WINDOW_HEIGHT or self.rect.right <= 0 or self.rect.left >= WINDOW_WIDTH:
-            self.kill()
\ No newline at end of file
+            self.release()
\ No newline at end of file
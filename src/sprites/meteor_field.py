@@ -0,0 +1,178 @@
+# ==============================================================================
+# MeteorField, a vectorized meteor swarm stored in NumPy arrays.
+# ==============================================================================
+
+import base64
+
+try:
+    import numpy as np
+except ImportError: # NumPy is only needed for the stress mode
+    np = None
+
+from ..settings import WINDOW_WIDTH, WINDOW_HEIGHT
+from ..collision import bounding_radius
+
+# Size categories by index, with the same odds, speeds and spin as Meteor
+SIZE_CATEGORIES = ("small", "medium", "large")
+STATE_ARRAYS = ("pos", "vel", "rotation", "rotation_speed", "size")
+SPEED_RANGES = ((500, 600), (400, 500), (300, 400))
+ROTATION_SPEED_RANGES = ((70, 100), (40, 70), (10, 40))
+if np is not None:
+    SPEED_LOW, SPEED_HIGH = np.array(SPEED_RANGES).T
+    SPIN_LOW, SPIN_HIGH = np.array(ROTATION_SPEED_RANGES).T
+
+class MeteorField:
+    def __init__(self, atlas, capacity=1024, seed=None):
+        if np is None:
+            raise ImportError("MeteorField needs NumPy, install it with: pip install numpy")
+        self.atlas = atlas
+        self.count = 0
+        self._allocate(capacity)
+
+        # Per size category lookups
+        h = atlas.surf.get_height()
+        scales = np.array([atlas.scales[c] for c in SIZE_CATEGORIES])
+        self.radii = np.array([bounding_radius(atlas.surf, s) for s in scales])
+        self.half_heights = h * scales / 2
+
+        self.drawn_rects = [] # Areas covered by the last draw, for dirty rendering
+        self.reset(seed)
+
+    def _allocate(self, capacity):
+        """Creates empty state arrays for the given number of meteors."""
+        self.capacity = capacity
+        self.pos = np.zeros((capacity, 2))
+        self.vel = np.zeros((capacity, 2))
+        self.rotation = np.zeros(capacity)
+        self.rotation_speed = np.zeros(capacity)
+        self.size = np.zeros(capacity, dtype=np.int8)
+
+    def _grow(self, needed):
+        """Doubles the capacity until it fits the needed number of meteors, keeping the live ones."""
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        for name in STATE_ARRAYS:
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+        self.capacity = capacity
+
+    def reset(self, seed=None):
+        """Removes every meteor and reseeds the field's random generator."""
+        self.count = 0
+        self.drawn_rects = []
+        self.rng = np.random.default_rng(seed)
+
+    def spawn(self, n=1):
+        """Spawns n meteors just above the top of the screen."""
+        if n <= 0:
+            return
+        if self.count + n > self.capacity:
+            self._grow(self.count + n)
+        rng = self.rng
+        start, end = self.count, self.count + n
+
+        # Same 25% small, 25% large, 50% medium split as Meteor
+        chance = rng.integers(1, 101, n)
+        size = np.where(chance <= 25, 0, np.where(chance <= 50, 2, 1)).astype(np.int8)
+        speed = rng.integers(SPEED_LOW[size], SPEED_HIGH[size] + 1)
+        spin = rng.integers(SPIN_LOW[size], SPIN_HIGH[size] + 1)
+
+        self.size[start:end] = size
+        self.pos[start:end, 0] = rng.integers(0, WINDOW_WIDTH + 1, n)
+        self.pos[start:end, 1] = -self.half_heights[size]
+        self.vel[start:end, 0] = rng.uniform(-0.5, 0.5, n) * speed
+        self.vel[start:end, 1] = speed
+        self.rotation[start:end] = 0
+        self.rotation_speed[start:end] = spin
+        self.count = end
+
+    def _compact(self, keep):
+        """Keeps only the meteors where keep is True, preserving their order."""
+        index = np.flatnonzero(keep)
+        m = len(index)
+        for array in (self.pos, self.vel, self.rotation, self.rotation_speed, self.size):
+            array[:m] = array[index]
+        self.count = m
+
+    def update(self, dt):
+        """Moves and spins every meteor in one step, then culls those that left the screen."""
+        n = self.count
+        pos = self.pos[:n]
+        pos += self.vel[:n] * dt
+        self.rotation[:n] += self.rotation_speed[:n] * dt
+
+        radius = self.radii[self.size[:n]]
+        keep = (pos[:, 1] - radius < WINDOW_HEIGHT) & (pos[:, 0] + radius > 0) & (pos[:, 0] - radius < WINDOW_WIDTH)
+        if not keep.all():
+            self._compact(keep)
+
+    def kill(self, indices):
+        """Removes the meteors at the given indices."""
+        keep = np.ones(self.count, dtype=bool)
+        keep[indices] = False
+        self._compact(keep)
+
+    def get_state(self):
+        """Returns the live meteors and the generator state, JSON-ready, for replay keyframes."""
+        n = self.count
+        arrays = {name: base64.b64encode(getattr(self, name)[:n].tobytes()).decode() for name in STATE_ARRAYS}
+        return {"count": n, "rng": self.rng.bit_generator.state, "arrays": arrays}
+
+    def set_state(self, state):
+        n = state["count"]
+        if n > self.capacity:
+            self._grow(n)
+        for name in STATE_ARRAYS:
+            array = getattr(self, name)
+            array[:n] = np.frombuffer(base64.b64decode(state["arrays"][name]), dtype=array.dtype).reshape((n,) + array.shape[1:])
+        self.count = n
+        self.rng.bit_generator.state = state["rng"]
+
+    def size_category(self, i):
+        return SIZE_CATEGORIES[self.size[i]]
+
+    def center(self, i):
+        return float(self.pos[i, 0]), float(self.pos[i, 1])
+
+    def _entry(self, i):
+        return self.atlas.get(SIZE_CATEGORIES[self.size[i]], self.rotation[i])
+
+    def collide(self, sprite):
+        """Returns the indices of the meteors overlapping the sprite's mask.
+        Bounding circles are tested for the whole field at once, masks only for the survivors."""
+        n = self.count
+        cx, cy = sprite.rect.center
+        dx = self.pos[:n, 0] - cx
+        dy = self.pos[:n, 1] - cy
+        reach = self.radii[self.size[:n]] + sprite.radius
+        hits = []
+        for i in np.flatnonzero(dx * dx + dy * dy <= reach * reach):
+            image, mask = self._entry(i)
+            w, h = image.get_size()
+            offset = (int(self.pos[i, 0] - w / 2 - sprite.rect.left), int(self.pos[i, 1] - h / 2 - sprite.rect.top))
+            if sprite.mask.overlap(mask, offset):
+                hits.append(int(i))
+        return hits
+
+    def blit_sequence(self, lag=0.0):
+        """Returns (image, position) pairs for every meteor, drawn where they were lag seconds ago."""
+        get = self.atlas.get
+        n = self.count
+        blit_sequence = []
+        pos = self.pos[:n] - self.vel[:n] * lag if lag else self.pos[:n]
+        for size, rotation, (x, y) in zip(self.size[:n].tolist(), self.rotation[:n].tolist(), pos.tolist()):
+            image = get(SIZE_CATEGORIES[size], rotation)[0]
+            w, h = image.get_size()
+            blit_sequence.append((image, (x - w / 2, y - h / 2)))
+        return blit_sequence
+
+    def draw(self, surface, special_flags=0):
+        """Draws every meteor with a single blits call and returns the covered rects."""
+        self.drawn_rects = surface.blits([(image, pos, None, special_flags) for image, pos in self.blit_sequence()])
+        return self.drawn_rects
+
+    def __len__(self):
+        return self.count
@@ -4,39 +4,51 @@
 
 import pygame
 from ..settings import PLAYER_SPEED, SHOOT_COOLDOWN, WINDOW_WIDTH, WINDOW_HEIGHT
-from .laser import Laser
+from ..controls import InputState
+from ..collision import bounding_radius
 
 class Player(pygame.sprite.Sprite):
-    def __init__(self, groups, surf, laser_surf, laser_group, sounds):
+    def __init__(self, groups, surf, laser_pool, on_shoot=None):
         super().__init__(groups)
         self.image = surf
+        self.mask = pygame.mask.from_surface(surf)
+        self.radius = bounding_radius(surf)
         self.rect = self.image.get_frect(center=(WINDOW_WIDTH/2, WINDOW_HEIGHT/2 + WINDOW_HEIGHT/4))
+        self.previous_center = None # Center before the last simulation tick, for render interpolation
         self.direction = pygame.math.Vector2() # Vector to store movement direction
         self.speed = PLAYER_SPEED
+        self.controls = InputState() # Set by the simulation before every update
 
         # Cooldown variables for shooting lasers
         self.can_shoot = True
+        self.time = 0 # Simulation time in ms, so cooldowns don't depend on the wall clock
         self.laser_shoot_time = 0
         self.shoot_cooldown = SHOOT_COOLDOWN
 
-        self._laser_surf = laser_surf
-        self._laser_group = laser_group
-        self._all_group = groups[0] if isinstance(groups, tuple) and groups else groups
-        self._sounds = sounds
+        self._laser_pool = laser_pool
+        self._on_shoot = on_shoot
+
+    def get_state(self):
+        """Returns the ship's position and shot cooldown, for replay keyframes. Movement comes from the inputs."""
+        return [self.rect.x, self.rect.y, self.time, self.can_shoot, self.laser_shoot_time]
+
+    def set_state(self, state):
+        x, y, self.time, self.can_shoot, self.laser_shoot_time = state
+        self.rect.topleft = (x, y)
 
     def _laser_cooldown(self):
         if not self.can_shoot:
-            current_time = pygame.time.get_ticks()
-            if current_time - self.laser_shoot_time >= self.shoot_cooldown:
+            if self.time - self.laser_shoot_time >= self.shoot_cooldown:
                 self.can_shoot = True # Allow shooting again after cooldown
 
     def update(self, dt):
         """Updates the player's state each frame."""
+        self.time += dt * 1000
 
         # Movement
-        keys = pygame.key.get_pressed()
-        self.direction.x = int(keys[pygame.K_d] or keys[pygame.K_RIGHT]) - int(keys[pygame.K_a] or keys[pygame.K_LEFT])
-        self.direction.y = int(keys[pygame.K_s] or keys[pygame.K_DOWN]) - int(keys[pygame.K_w] or keys[pygame.K_UP])
+        controls = self.controls
+        self.direction.x = int(controls.right) - int(controls.left)
+        self.direction.y = int(controls.down) - int(controls.up)
         if self.direction.magnitude() > 0:
             self.direction = self.direction.normalize()
         self.rect.center += self.direction * self.speed * dt
@@ -52,10 +64,10 @@ class Player(pygame.sprite.Sprite):
             self.rect.top = 0
 
         # Shooting
-        recent_keys = pygame.key.get_just_pressed()
-        if recent_keys[pygame.K_SPACE] and self.can_shoot:
-            Laser(self._laser_surf, self.rect.midtop, (self._all_group, self._laser_group))
+        if controls.shoot and self.can_shoot:
+            self._laser_pool.acquire(self.rect.midtop)
             self.can_shoot = False # Prevent shooting until cooldown ends
-            self.laser_shoot_time = pygame.time.get_ticks() # Record time of shooting
-            self._sounds.laser.play()
-        self._laser_cooldown()
\ No newline at end of file
+            self.laser_shoot_time = self.time # Record time of shooting
+            if self._on_shoot:
+                self._on_shoot()
+        self._laser_cooldown()
@@ -0,0 +1,62 @@
+# ==============================================================================
+# Object pools that recycle sprites instead of building new ones.
+# ==============================================================================
+
+import pygame
+
+class PooledSprite(pygame.sprite.Sprite):
+    """A sprite that goes back to its pool, if it has one, when it is released."""
+    pool = None
+    pooled = False # True while the sprite sits in its pool's free list
+    previous_center = None # Center before the last simulation tick, None for a fresh spawn
+
+    def release(self):
+        self.previous_center = None
+        if self.pool is not None:
+            self.pool.release(self)
+        else:
+            self.kill()
+
+class SpritePool:
+    """Hands out sprites, building new ones whenever none are idle, so live sprites are never capped.
+    Released sprites wait in a free list of at most max_idle, beyond that they are dropped."""
+    def __init__(self, factory, groups, max_idle):
+        self.factory = factory # Called as factory(groups, *args) when the pool is empty
+        self.groups = groups # Groups every acquired sprite joins
+        self.max_idle = max_idle # Largest number of released sprites kept for reuse
+        self._free = []
+
+        # Pool stats
+        self.hits = 0
+        self.misses = 0
+        self.dropped = 0
+
+    def acquire(self, *args):
+        """Returns a sprite set up with the given arguments, reusing an idle one if possible."""
+        if self._free:
+            sprite = self._free.pop()
+            sprite.pooled = False
+            sprite.spawn(*args)
+            sprite.add(*self.groups)
+            self.hits += 1
+            return sprite
+
+        self.misses += 1
+        sprite = self.factory(self.groups, *args)
+        sprite.pool = self
+        return sprite
+
+    def release(self, sprite):
+        """Removes the sprite from its groups and keeps it for reuse."""
+        if sprite.pooled:
+            return
+        sprite.kill()
+        if len(self._free) < self.max_idle:
+            sprite.pooled = True
+            self._free.append(sprite)
+        else:
+            self.dropped += 1
+
+    def stats(self):
+        """Returns the pool's hit, miss and drop counts and its number of idle sprites."""
+        return {"hits": self.hits, "misses": self.misses, "dropped": self.dropped, "free": len(self._free)}
@@ -0,0 +1,300 @@
+# ==============================================================================
+# Session telemetry: events queued in memory by the game loop and written by a
+# background thread to size-rotated, gzip-compressed JSON Lines files, plus an
+# analyzer that streams them into frame time histograms and stutter reports.
+# Analyze with: python -m src.telemetry [FILES OR DIRECTORIES]
+# ==============================================================================
+
+import argparse
+import atexit
+import gzip
+import heapq
+import json
+import os
+import sys
+import threading
+import zlib
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+from .settings import (
+    FPS, SIM_TICK_RATE, TELEMETRY_DIR, TELEMETRY_QUEUE_EVENTS, TELEMETRY_FLUSH_SECONDS, TELEMETRY_ROTATE_BYTES,
+    TELEMETRY_KEEP_FILES, TELEMETRY_STUTTER_MS
+)
+
+LOG_SUFFIX = ".jsonl.gz"
+
+class Telemetry:
+    def __init__(self, directory=TELEMETRY_DIR, max_events=TELEMETRY_QUEUE_EVENTS):
+        self.directory = Path(directory)
+        self.max_events = max_events
+        self.enabled = False
+        self.session = None
+        self.dropped = 0 # Events lost because the queue was full, only counted by emit()
+        self._dropped_logged = 0 # How many of those the writer has logged, only touched by the writer
+
+        # deque appends and pops are atomic, so the game loop never takes a lock
+        self._events = deque()
+        self._start = 0.0
+        self._stop = threading.Event()
+        self._writer = None
+        self._file = None
+        self._raw = None
+        self._part = 0
+
+    def start(self):
+        """Starts a session and its writer thread. Until then emit() does nothing."""
+        if self.enabled:
+            return
+        self.session = f"{datetime.now():%Y%m%d_%H%M%S}_{os.getpid()}"
+        self._start = perf_counter()
+        self.enabled = True
+        self.emit("start", fps=FPS, tick_rate=SIM_TICK_RATE)
+        self._writer = threading.Thread(target=self._write_loop, name="telemetry", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def emit(self, kind, **fields):
+        """Queues an event stamped with the seconds since the session started. Never blocks."""
+        if not self.enabled:
+            return
+        if len(self._events) >= self.max_events:
+            self.dropped += 1
+            return
+        fields["e"] = kind
+        fields["t"] = round(perf_counter() - self._start, 4)
+        self._events.append(fields)
+
+    def _open(self):
+        """Starts the next log file of the session, deleting the oldest files beyond TELEMETRY_KEEP_FILES."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._part += 1
+        self._raw = open(self.directory / f"{self.session}_{self._part:03d}{LOG_SUFFIX}", "wb")
+        self._file = gzip.GzipFile(fileobj=self._raw, mode="wb")
+        self._file.write(json.dumps({"e": "session", "session": self.session, "part": self._part}).encode() + b"\n")
+
+        for old in sorted(self.directory.glob(f"*{LOG_SUFFIX}"))[:-TELEMETRY_KEEP_FILES]:
+            old.unlink(missing_ok=True)
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._raw.close()
+            self._file = self._raw = None
+
+    def _flush(self):
+        """Writes every queued event as one batch, rotating the file once it has grown large enough."""
+        events = self._events
+        count = len(events)
+        dropped = self.dropped - self._dropped_logged
+        if not count and not dropped:
+            return
+        lines = [json.dumps(events.popleft(), separators=(",", ":")) for _ in range(count)]
+        if dropped:
+            lines.append(json.dumps({"e": "dropped", "count": dropped}))
+            self._dropped_logged += dropped
+
+        if self._file is None:
+            self._open()
+        self._file.write(("\n".join(lines) + "\n").encode())
+        if self._raw.tell() >= TELEMETRY_ROTATE_BYTES:
+            self._close_file()
+
+    def _write_loop(self):
+        try:
+            while not self._stop.wait(TELEMETRY_FLUSH_SECONDS):
+                self._flush()
+            self._flush()
+            self._close_file()
+        except OSError as e:
+            print(f"Error writing telemetry: {e}")
+            self.enabled = False
+
+    def close(self):
+        """Logs the end of the session and waits for the writer to write it."""
+        if not self.enabled:
+            return
+        self.emit("end")
+        self.enabled = False
+        self._stop.set()
+        self._writer.join(timeout=5)
+
+telemetry = Telemetry()
+
+# ==============================================================================
+# Offline analysis
+# ==============================================================================
+
+HISTOGRAM_BIN_MS = 0.25
+HISTOGRAM_BINS = 400 # Up to 100 ms, slower frames share the last bin
+REPORT_BINS = (4, 8, 12, 17, 25, 33, 50, 100) # ms, upper edges of the printed histogram rows
+MIN_RATE_SECONDS = 10 # Sessions shorter than this print no stutter rate
+
+class FrameStats:
+    """Streaming frame time statistics: a fixed-size histogram, stutter runs and the worst frames."""
+    def __init__(self, stutter_ms, session=""):
+        self.stutter_ms = stutter_ms
+        self.session = session
+        self.bins = [0] * (HISTOGRAM_BINS + 1)
+        self.frames = 0
+        self.total_ms = 0.0
+        self.stutters = 0
+        self.run = 0 # Stutter frames in a row so far
+        self.longest_run = 0
+        self.worst = [] # Min-heap of (ms, time, meteors, session)
+
+    def add(self, ms, t=0.0, meteors=0):
+        self.bins[min(int(ms / HISTOGRAM_BIN_MS), HISTOGRAM_BINS)] += 1
+        self.frames += 1
+        self.total_ms += ms
+        if ms > self.stutter_ms:
+            self.stutters += 1
+            self.run += 1
+            self.longest_run = max(self.longest_run, self.run)
+        else:
+            self.run = 0
+        if len(self.worst) < 5:
+            heapq.heappush(self.worst, (ms, t, meteors, self.session))
+        elif ms > self.worst[0][0]:
+            heapq.heapreplace(self.worst, (ms, t, meteors, self.session))
+
+    def merge(self, other):
+        self.bins = [a + b for a, b in zip(self.bins, other.bins)]
+        self.frames += other.frames
+        self.total_ms += other.total_ms
+        self.stutters += other.stutters
+        self.longest_run = max(self.longest_run, other.longest_run)
+        for worst in other.worst:
+            if len(self.worst) < 5:
+                heapq.heappush(self.worst, worst)
+            elif worst[0] > self.worst[0][0]:
+                heapq.heapreplace(self.worst, worst)
+
+    def percentile(self, p):
+        """Upper edge of the histogram bin holding the given percentile, in ms."""
+        target = self.frames * p / 100
+        seen = 0
+        for i, count in enumerate(self.bins):
+            seen += count
+            if seen >= target and count:
+                return min(i + 1, HISTOGRAM_BINS) * HISTOGRAM_BIN_MS
+        return 0.0
+
+    def count_below(self, ms):
+        return sum(self.bins[:int(ms / HISTOGRAM_BIN_MS)])
+
+class SessionStats:
+    def __init__(self, session, stutter_ms):
+        self.session = session
+        self.frames = FrameStats(stutter_ms, session)
+        self.seconds = 0.0
+        self.events = {} # kind -> count, for everything but frames
+        self.spawned = 0
+        self.destroyed = 0
+        self.dropped = 0
+        self.truncated = False
+
+    def add(self, event):
+        kind = event.get("e")
+        self.seconds = max(self.seconds, event.get("t", 0.0))
+        if kind == "frame":
+            self.frames.add(event["ms"], event["t"], event.get("meteors", 0))
+            self.spawned += event.get("spawned", 0)
+            self.destroyed += event.get("destroyed", 0)
+            return
+        if kind == "dropped":
+            self.dropped += event["count"]
+        elif kind in ("pause", "resume"):
+            self.frames.run = 0 # The menu in between isn't part of any stutter run
+        self.events[kind] = self.events.get(kind, 0) + 1
+
+def _log_files(paths):
+    """Expands directories into their log files, in the order they were written."""
+    files = []
+    for path in map(Path, paths):
+        files.extend(sorted(path.glob(f"*{LOG_SUFFIX}")) if path.is_dir() else [path])
+    return files
+
+def _events(path):
+    """Yields the events of one log file line by line. A file cut short by a crash yields what it can."""
+    try:
+        with gzip.open(path, "rt") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    return
+    except (EOFError, zlib.error, OSError):
+        yield {"e": "truncated"}
+
+def analyze(paths, stutter_ms=TELEMETRY_STUTTER_MS):
+    """Streams the given log files and returns the per-session statistics, oldest session first."""
+    sessions = {}
+    for path in _log_files(paths):
+        stats = None
+        for event in _events(path):
+            if event.get("e") == "session":
+                session = event["session"]
+                stats = sessions.setdefault(session, SessionStats(session, stutter_ms))
+            elif event.get("e") == "truncated":
+                if stats is None:
+                    # Cut off before its header, the file name still tells the session
+                    session = path.name[:-len(LOG_SUFFIX)].rpartition("_")[0]
+                    stats = sessions.setdefault(session, SessionStats(session, stutter_ms))
+                stats.truncated = True
+            elif stats is not None:
+                stats.add(event)
+    return list(sessions.values())
+
+def _print_histogram(frames):
+    previous = 0
+    width = 40
+    for edge in REPORT_BINS + (None,):
+        count = frames.frames - frames.count_below(previous) if edge is None else frames.count_below(edge) - frames.count_below(previous)
+        share = count / frames.frames if frames.frames else 0
+        label = f"{previous:>4}+    ms" if edge is None else f"{previous:>4}-{edge:<4}ms"
+        print(f"  {label} {'#' * round(share * width):<{width}} {share:6.1%} {count:>9}")
+        previous = edge
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Frame time histograms and stutter reports from telemetry logs.")
+    parser.add_argument("paths", nargs="*", default=[TELEMETRY_DIR], help="log files or directories holding them")
+    parser.add_argument("--stutter-ms", type=float, default=TELEMETRY_STUTTER_MS, help="frames slower than this are stutter")
+    parser.add_argument("--histograms", action="store_true", help="print a frame time histogram for every session")
+    args = parser.parse_args(argv)
+
+    sessions = analyze(args.paths, args.stutter_ms)
+    if not sessions:
+        print("No telemetry found.")
+        return 1
+
+    fleet = FrameStats(args.stutter_ms)
+    print(f"{'session':<24} {'minutes':>7} {'frames':>8} {'p50':>6} {'p95':>6} {'p99':>6} {'max':>7} "
+          f"{'stutter':>8} {'/min':>6} {'run':>4} {'deaths':>6} {'pauses':>6}")
+    for stats in sessions:
+        frames = stats.frames
+        fleet.merge(frames)
+        minutes = stats.seconds / 60
+        worst = max(frames.worst)[0] if frames.worst else 0.0
+        rate = f"{frames.stutters / minutes:6.1f}" if stats.seconds >= MIN_RATE_SECONDS else f"{'n/a':>6}"
+        flags = (" truncated" if stats.truncated else "") + (f" dropped {stats.dropped}" if stats.dropped else "")
+        print(f"{stats.session:<24} {minutes:7.1f} {frames.frames:8} {frames.percentile(50):6.2f} {frames.percentile(95):6.2f} "
+              f"{frames.percentile(99):6.2f} {worst:7.1f} {frames.stutters:8} {rate} "
+              f"{frames.longest_run:4} {stats.events.get('death', 0):6} {stats.events.get('pause', 0):6}{flags}")
+        if args.histograms and frames.frames:
+            _print_histogram(frames)
+
+    print(f"\nFleet: {len(sessions)} sessions, {fleet.frames} frames, stutter above {args.stutter_ms:.1f} ms "
+          f"in {fleet.stutters / max(fleet.frames, 1):.2%} of frames")
+    print(f"p50 {fleet.percentile(50):.2f} ms  p95 {fleet.percentile(95):.2f} ms  "
+          f"p99 {fleet.percentile(99):.2f} ms  p99.9 {fleet.percentile(99.9):.2f} ms")
+    _print_histogram(fleet)
+
+    print("\nWorst frames:")
+    for ms, t, meteors, session in sorted(fleet.worst, reverse=True):
+        print(f"  {ms:7.1f} ms  {session} at {t:.1f} s with {meteors} meteors")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
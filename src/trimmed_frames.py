@@ -0,0 +1,114 @@
+# ==============================================================================
+# Animation frames cropped to their visible pixels, with the offset that puts
+# them back in place on the original canvas, and a report of what it saves.
+# Report with: python -m src.trimmed_frames [--repeat N]
+# ==============================================================================
+
+import argparse
+import sys
+from time import perf_counter
+from typing import NamedTuple
+import pygame
+from .settings import WINDOW_WIDTH, WINDOW_HEIGHT, EXPLOSION_FRAME_COUNT, CONFETTI_FRAME_COUNT, TRIM_RLE, TRIM_RLE_MAX_COVERAGE
+
+class TrimmedFrame(NamedTuple):
+    image: pygame.Surface # Only the bounding box of the non-transparent pixels
+    offset: tuple # Top left of the image on the original canvas
+    size: tuple # Size of the original canvas
+
+    def rect(self, center):
+        """Returns where the image goes so the original canvas would be centered on the given point."""
+        x = center[0] - self.size[0] / 2 + self.offset[0]
+        y = center[1] - self.size[1] / 2 + self.offset[1]
+        return self.image.get_frect(topleft=(x, y))
+
+def trim(surf, rle=False):
+    """Crops a frame to its non-transparent pixels. With rle, sparse frames are RLE-accelerated,
+    which is much faster for plain blits but slow for blend flags and transforms.
+    A TrimmedFrame, as baked into the asset pack, is already cropped and only gets the RLE check."""
+    if isinstance(surf, TrimmedFrame):
+        frame = surf
+    else:
+        rect = surf.get_bounding_rect()
+        if not rect.width or not rect.height:
+            rect = pygame.Rect(0, 0, 1, 1) # Fully transparent, keep one pixel so it can still be drawn
+        frame = TrimmedFrame(surf.subsurface(rect).copy(), rect.topleft, surf.get_size())
+    if rle and TRIM_RLE and coverage(frame.image) <= TRIM_RLE_MAX_COVERAGE:
+        frame.image.set_alpha(255, pygame.RLEACCEL)
+    return frame
+
+def coverage(surf):
+    """Fraction of a surface's pixels that are mostly opaque."""
+    w, h = surf.get_size()
+    return pygame.mask.from_surface(surf).count() / (w * h)
+
+def scale(frame, factor):
+    """Scales a trimmed frame, its offset and its canvas together."""
+    w, h = frame.image.get_size()
+    image = pygame.transform.scale(frame.image, (max(1, int(w * factor)), max(1, int(h * factor))))
+    offset = (round(frame.offset[0] * factor), round(frame.offset[1] * factor))
+    size = (int(frame.size[0] * factor), int(frame.size[1] * factor))
+    return TrimmedFrame(image, offset, size)
+
+def is_rle(surf):
+    return bool(surf.get_flags() & pygame.RLEACCEL)
+
+def _blit_ms(display_surface, blits, repeat):
+    """Best time of drawing the given (image, position) pairs once each, in ms."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        for image, pos in blits:
+            display_surface.blit(image, pos)
+        best = min(best, perf_counter() - start)
+    return best * 1000
+
+def report(display_surface, name, originals, frames, repeat=5):
+    """Compares the full and trimmed frames of one animation, drawn centered on the window."""
+    center = (WINDOW_WIDTH / 2, WINDOW_HEIGHT / 2)
+    full_bytes = sum(surf.get_width() * surf.get_height() * surf.get_bytesize() for surf in originals)
+    trimmed_bytes = sum(frame.image.get_width() * frame.image.get_height() * frame.image.get_bytesize() for frame in frames)
+    full_area = sum(surf.get_width() * surf.get_height() for surf in originals)
+    trimmed_area = sum(frame.image.get_width() * frame.image.get_height() for frame in frames)
+    full_ms = _blit_ms(display_surface, [(surf, surf.get_rect(center=center)) for surf in originals], repeat)
+    trimmed_ms = _blit_ms(display_surface, [(frame.image, frame.rect(center)) for frame in frames], repeat)
+    return {
+        "animation": name,
+        "frames": len(frames),
+        "rle_frames": sum(is_rle(frame.image) for frame in frames),
+        "full_mib": full_bytes / 2 ** 20,
+        "trimmed_mib": trimmed_bytes / 2 ** 20,
+        "full_mpx": full_area / 1e6,
+        "trimmed_mpx": trimmed_area / 1e6,
+        "full_ms": full_ms,
+        "trimmed_ms": trimmed_ms,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report the memory and blit area saved by trimming animation frames.")
+    parser.add_argument("--repeat", type=int, default=5, help="times each animation is drawn for the timings")
+    args = parser.parse_args(argv)
+
+    from .asset_pack import load_images
+    pygame.init()
+    display_surface = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.HIDDEN)
+
+    # Explosions may be drawn premultiplied and get scaled, so only confetti is RLE-accelerated
+    animations = (("explosion", EXPLOSION_FRAME_COUNT, False), ("confetti", CONFETTI_FRAME_COUNT, True))
+    print(f"{'animation':<10} {'frames':>6} {'rle':>4} {'memory MiB':>19} {'saved':>6} "
+          f"{'blit area Mpx':>17} {'saved':>6} {'blit ms / cycle':>17}")
+    for name, count, rle in animations:
+        names = [f"{name}/{i}" for i in range(count)]
+        images = load_images(set(names))
+        originals = [images[n] for n in names]
+        frames = [trim(surf, rle) for surf in originals]
+        r = report(display_surface, name, originals, frames, args.repeat)
+        print(f"{name:<10} {r['frames']:>6} {r['rle_frames']:>4} "
+              f"{r['full_mib']:8.2f} -> {r['trimmed_mib']:7.2f} {1 - r['trimmed_mib'] / r['full_mib']:6.1%} "
+              f"{r['full_mpx']:7.2f} -> {r['trimmed_mpx']:6.2f} {1 - r['trimmed_mpx'] / r['full_mpx']:6.1%} "
+              f"{r['full_ms']:7.2f} -> {r['trimmed_ms']:6.2f}")
+    pygame.quit()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,34 +2,105 @@
 # Class to handle the star background.
 # ==============================================================================
 
+import math
+import random
 import pygame
-from random import randint
-from ..settings import WINDOW_WIDTH, WINDOW_HEIGHT, BG_COLOR, STAR_COUNT, STAR_MIN_DISTANCE
+from ..settings import WINDOW_WIDTH, WINDOW_HEIGHT, BG_COLOR, STAR_COUNT, STAR_MIN_DISTANCE, STAR_LAYER_SPEEDS
 from ..assets import assets
+from .sprite_batch import fblits
+
+def poisson_disc(width, height, min_distance, rng=random, attempts=30):
+    """Generates points at least min_distance apart using Bridson's algorithm.
+    A grid with one point per cell keeps every distance check to a few neighbours."""
+    cell_size = min_distance / math.sqrt(2)
+    cols, rows = int(width / cell_size) + 1, int(height / cell_size) + 1
+    grid = [None] * (cols * rows)
+    min_distance_sq = min_distance * min_distance
+
+    def fits(x, y):
+        col, row = int(x / cell_size), int(y / cell_size)
+        for r in range(max(0, row - 2), min(rows, row + 3)):
+            for c in range(max(0, col - 2), min(cols, col + 3)):
+                point = grid[r * cols + c]
+                if point and (point[0] - x) ** 2 + (point[1] - y) ** 2 < min_distance_sq:
+                    return False
+        return True
+
+    first = (rng.uniform(0, width), rng.uniform(0, height))
+    points = [first]
+    active = [first]
+    grid[int(first[1] / cell_size) * cols + int(first[0] / cell_size)] = first
+    while active:
+        index = rng.randrange(len(active))
+        px, py = active[index]
+        for _ in range(attempts):
+            # Try a random point in the ring between one and two minimum distances away
+            angle = rng.uniform(0, 2 * math.pi)
+            radius = rng.uniform(min_distance, 2 * min_distance)
+            x, y = px + math.cos(angle) * radius, py + math.sin(angle) * radius
+            if 0 <= x < width and 0 <= y < height and fits(x, y):
+                point = (x, y)
+                points.append(point)
+                active.append(point)
+                grid[int(y / cell_size) * cols + int(x / cell_size)] = point
+                break
+        else:
+            # No room left around this point
+            active[index] = active[-1]
+            active.pop()
+    return points
 
 class Background:
-    def __init__(self):
-        self.star_positions = self._generate_stars()
-
-    def _generate_stars(self):
-        """Generates random star positions, ensuring a minimum distance between them."""
-        star_positions = []
-        while len(star_positions) < STAR_COUNT:
-            x = randint(0, WINDOW_WIDTH)
-            y = randint(0, WINDOW_HEIGHT)
-
-            # Check for minimum distance from other stars
-            is_valid_position = True
-            for sx, sy in star_positions:
-                if pygame.math.Vector2(x, y).distance_to((sx, sy)) < STAR_MIN_DISTANCE:
-                    is_valid_position = False
-                    break
-            if is_valid_position:
-                star_positions.append((x, y))
-        return star_positions
+    _shared = None
+
+    def __init__(self, star_count=STAR_COUNT, min_distance=STAR_MIN_DISTANCE, layer_speeds=STAR_LAYER_SPEEDS, rng=random):
+        points = poisson_disc(WINDOW_WIDTH, WINDOW_HEIGHT, min_distance, rng)
+        self.star_positions = [(int(x), int(y)) for x, y in rng.sample(points, min(star_count, len(points)))]
+        self.layer_speeds = layer_speeds
+        self.offsets = [0.0] * len(layer_speeds)
+        self.layers = self._render_layers()
+
+    @classmethod
+    def shared(cls):
+        """Returns the starfield shared by every scene, creating it on first use."""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    @property
+    def animated(self):
+        """True if any layer scrolls, so the background changes every frame."""
+        return any(self.layer_speeds[1:])
+
+    def _render_layers(self):
+        """Pre-renders the stars into one opaque base layer plus a transparent layer per parallax speed."""
+        layers = [pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)).convert()]
+        layers[0].fill(BG_COLOR)
+        for _ in self.layer_speeds[1:]:
+            layer = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA).convert_alpha()
+            layer.fill((0, 0, 0, 0))
+            layers.append(layer)
+
+        # Stars are dealt round-robin across the layers
+        for i, pos in enumerate(self.star_positions):
+            layers[i % len(layers)].blit(assets.star_surf, pos)
+        return layers
+
+    def update(self, dt):
+        """Scrolls the parallax layers."""
+        for i, speed in enumerate(self.layer_speeds):
+            self.offsets[i] = (self.offsets[i] + speed * dt) % WINDOW_HEIGHT
+
+    def blit_sequence(self):
+        """Returns (surface, position) pairs drawing every layer at its scroll offset."""
+        blit_sequence = [(self.layers[0], (0, int(self.offsets[0])))]
+        if self.offsets[0]:
+            blit_sequence.append((self.layers[0], (0, int(self.offsets[0]) - WINDOW_HEIGHT)))
+        for layer, offset in zip(self.layers[1:], self.offsets[1:]):
+            blit_sequence.append((layer, (0, int(offset))))
+            blit_sequence.append((layer, (0, int(offset) - WINDOW_HEIGHT)))
+        return blit_sequence
 
     def draw(self, surface):
-        """Fills the background color and draws the stars."""
-        surface.fill(BG_COLOR)
-        for x, y in self.star_positions:
-            surface.blit(assets.star_surf, (x, y))
\ No newline at end of file
+        """Draws the pre-rendered background color and stars in one call."""
+        fblits(surface, self.blit_sequence())
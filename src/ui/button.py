@@ -4,10 +4,11 @@
 
 import pygame
 from ..settings import TEXT_COLOR, BORDER_RADIUS, BG_COLOR, ACCENT_COLOR
+from .text_cache import text_cache
 
 class Button:
     def __init__(self, text, font, center, callback, color = TEXT_COLOR):
-        self.surface = font.render(text, True, color = color)
+        self.surface = text_cache.render(font, text, color)
         self.rect = self.surface.get_rect(center=center)
         self.padding = 12
         self.frame = self.rect.inflate(self.padding * 2, self.padding).move(0, -5)
@@ -3,9 +3,10 @@
 # ==============================================================================
 
 import pygame
+from functools import lru_cache
 from .frame import Frame
 from ..settings import (
-    WINDOW_WIDTH, WINDOW_HEIGHT, FPS, HORIZONTAL_MARGIN, VERTICAL_MARGIN, BG_COLOR,
+    WINDOW_WIDTH, WINDOW_HEIGHT, MENU_FPS, MENU_IDLE_TIMEOUT, HORIZONTAL_MARGIN, VERTICAL_MARGIN, BG_COLOR,
     TEXT_COLOR, TITLE_COLOR, MUTE_COLOR, PAUSE_COLOR, BACK_BUTTON_COLOR,
     GAME_OVER_COLOR, HIGH_SCORE_COLOR, LEADING, BUTTON_SPACE, DEFAULT_MENU_VOLUME
 )
@@ -13,15 +14,44 @@ from ..assets import assets
 from ..game import Game
 from .button import Button
 from .background import Background
+from .renderer import Renderer
+from .text_cache import text_cache
 
 def _display_text(display_surface, text, font, pos, color=TEXT_COLOR):
     """A helper function to render and display text."""
-    text_surf = font.render(text, True, color)
+    text_surf = text_cache.render(font, text, color)
     text_rect = text_surf.get_rect(center=pos)
     display_surface.blit(text_surf, text_rect)
 
-def main_menu(display_surface, sounds, high_score_manager):
-    background = Background()
+@lru_cache(maxsize=1)
+def _dim_overlay():
+    """Returns the semi-transparent overlay drawn behind pop-up menus, built once."""
+    overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
+    overlay.fill((0, 0, 0, 125))
+    return overlay
+
+def _menu_events(clock, renderer, animating=False):
+    """Returns the pending events, capped at MENU_FPS.
+    When nothing is animating, sleeps until input arrives instead of spinning."""
+    if animating:
+        events = pygame.event.get()
+    else:
+        event = pygame.event.wait(MENU_IDLE_TIMEOUT)
+        events = [] if event.type == pygame.NOEVENT else [event]
+        events.extend(pygame.event.get())
+    clock.tick(MENU_FPS)
+
+    # Anything that can change what the menu shows means it has to be redrawn
+    for event in events:
+        if event.type in (pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN, pygame.WINDOWEXPOSED, pygame.WINDOWSHOWN):
+            renderer.invalidate()
+    return events
+
+def main_menu(display_surface, sounds, high_score_manager, stress=False, record=False, render_scale=1.0,
+              dynamic_resolution=False):
+    background = Background.shared()
+    renderer = Renderer(display_surface, background, on_demand=True)
+    clock = pygame.time.Clock()
 
     try:
         sounds.set_display_volume(sounds.set_volume(DEFAULT_MENU_VOLUME))
@@ -30,7 +60,7 @@ def main_menu(display_surface, sounds, high_score_manager):
     sounds.play_menu_music()
 
     def start_game():
-        game_instance = Game(display_surface, sounds, high_score_manager)
+        game_instance = Game(display_surface, sounds, high_score_manager, stress, record, render_scale, dynamic_resolution)
         game_instance.run(sounds.get_game_volume() / 3)
         return True
 
@@ -60,7 +90,7 @@ def main_menu(display_surface, sounds, high_score_manager):
 
     while True:
         in_game = False
-        for event in pygame.event.get():
+        for event in _menu_events(clock, renderer):
             if event.type == pygame.QUIT:
                 pygame.quit()
                 exit()
@@ -68,7 +98,6 @@ def main_menu(display_surface, sounds, high_score_manager):
                 mouse_pos = pygame.mouse.get_pos()
                 for button in buttons:
                     if button.check_click(mouse_pos):
-                        background = Background()
                         in_game = True
 
         if in_game:
@@ -77,17 +106,20 @@ def main_menu(display_surface, sounds, high_score_manager):
             sounds.play_menu_music()
 
         # Draw the background and buttons
-        background.draw(display_surface)
-        display_surface.blit(assets.player_surf, player_rect)
-        for button in buttons:
-            button.draw(display_surface)
+        if renderer.needs_redraw:
+            renderer.draw_background()
+            display_surface.blit(assets.player_surf, player_rect, special_flags=assets.sprite_blend_flags)
+            for button in buttons:
+                button.draw(display_surface)
 
         # Update the screen display
-        pygame.display.update()
+        renderer.present()
 
 def settings_menu(display_surface, sounds):
     running = True
-    background = Background()
+    background = Background.shared()
+    renderer = Renderer(display_surface, background, on_demand=True)
+    clock = pygame.time.Clock()
 
     try:
         volume = sounds.get_display_volume()
@@ -102,7 +134,7 @@ def settings_menu(display_surface, sounds):
     back_button = Button("Back", assets.font_small, (HORIZONTAL_MARGIN, VERTICAL_MARGIN), back, BACK_BUTTON_COLOR)
 
     # Render the title text of the Settings menu
-    title_surface = assets.font_large.render("Settings", True, TITLE_COLOR)
+    title_surface = text_cache.render(assets.font_large, "Settings", TITLE_COLOR)
 
     # Segments volume UI
     volume_segments = []
@@ -125,7 +157,7 @@ def settings_menu(display_surface, sounds):
 
     # Define the mute checkbox
     mute_checkbox_rect = pygame.Rect(WINDOW_WIDTH // 2 - 75, WINDOW_HEIGHT // 2 + VERTICAL_MARGIN // 2, assets.font_small.get_height(), assets.font_small.get_height())
-    mute_text = assets.font_small.render("Mute", True, TEXT_COLOR)
+    mute_text = text_cache.render(assets.font_small, "Mute", TEXT_COLOR)
 
     # Create a frame for settings menu
     frame_x_start = HORIZONTAL_MARGIN
@@ -135,7 +167,7 @@ def settings_menu(display_surface, sounds):
     title_frame = Frame(frame_x_start, frame_y_strat, frame_width , VERTICAL_MARGIN * 1.5)
 
     while running:
-        for event in pygame.event.get():
+        for event in _menu_events(clock, renderer):
             if event.type == pygame.QUIT:
                 pygame.quit()
                 exit()
@@ -154,11 +186,15 @@ def settings_menu(display_surface, sounds):
                 if mute_checkbox_rect.collidepoint(mouse_pos):
                     sounds.toggle_mute(volume)
 
+        if not renderer.needs_redraw:
+            renderer.present()
+            continue
+
         # Update the sound volume based on mute state and the current volume
         color = MUTE_COLOR if sounds.is_mute() else TEXT_COLOR
 
         # Draw the background and buttons
-        background.draw(display_surface)
+        renderer.draw_background()
         back_button.draw(display_surface)
 
         # Draw the frame for menu and title
@@ -170,7 +206,7 @@ def settings_menu(display_surface, sounds):
 
         # Display the current volume level as a percentage
         display_volume = round(volume * 10) / 10
-        volume_text = assets.font_small.render(f"Volume: {int(display_volume * 100)}%", True, TEXT_COLOR)
+        volume_text = text_cache.render(assets.font_small, f"Volume: {int(display_volume * 100)}%", TEXT_COLOR)
         display_surface.blit(volume_text, volume_text.get_rect(center=(WINDOW_WIDTH // 2, VERTICAL_MARGIN * 4)))
 
         # Draw the border around the volume control
@@ -187,11 +223,13 @@ def settings_menu(display_surface, sounds):
         display_surface.blit(mute_text, mute_text.get_rect(topleft=(mute_checkbox_rect.left + 45, mute_checkbox_rect.y)))
 
         # Update the screen display
-        pygame.display.update()
+        renderer.present()
 
 def how_to_play_menu(display_surface):
     running = True
-    background = Background()
+    background = Background.shared()
+    renderer = Renderer(display_surface, background, on_demand=True)
+    clock = pygame.time.Clock()
 
     def back():
         nonlocal running
@@ -208,34 +246,38 @@ def how_to_play_menu(display_surface):
     title_frame = Frame(frame_x_start, frame_y_strat, frame_width, VERTICAL_MARGIN * 1.5 - LEADING)
 
     # Render the text surfaces for title and instructions
-    title_surface = assets.font_large.render("How to Play", True, TITLE_COLOR)
+    title_surface = text_cache.render(assets.font_large, "How to Play", TITLE_COLOR)
     instructions = [
         "- W/A/S/D or Arrow Keys to move.",
         "- Press SPACE to shoot lasers.",
         "- Avoid meteors - getting hit will destroy your ship.",
         "- Live longer to earn points."
     ]
-    instruction_texts = [assets.font_small.render(t, True, TEXT_COLOR) for t in instructions]
+    instruction_texts = [text_cache.render(assets.font_small, t, TEXT_COLOR) for t in instructions]
 
     # Render the text surfaces for subtitle and meteor details
-    subtitle_surface = assets.font_small.render("Meteor types:", True, TEXT_COLOR)
+    subtitle_surface = text_cache.render(assets.font_small, "Meteor types:", TEXT_COLOR)
     meteor_details = [
         "- Small Meteors: Small, fast, and tricky to hit.",
         "- Medium Meteors: Medium size with normal speed.",
         "- Big Meteors: Large, slow, but hard to avoid."
     ]
-    meteor_texts = [assets.font_small.render(t, True, TEXT_COLOR) for t in meteor_details]
+    meteor_texts = [text_cache.render(assets.font_small, t, TEXT_COLOR) for t in meteor_details]
 
     while running:
-        for event in pygame.event.get():
+        for event in _menu_events(clock, renderer):
             if event.type == pygame.QUIT:
                 pygame.quit()
                 exit()
             if event.type == pygame.MOUSEBUTTONDOWN:
                 back_button.check_click(pygame.mouse.get_pos())
 
+        if not renderer.needs_redraw:
+            renderer.present()
+            continue
+
         # Draw the background and buttons
-        background.draw(display_surface)
+        renderer.draw_background()
         back_button.draw(display_surface)
 
         # Draw the frame for menu and title
@@ -257,14 +299,14 @@ def how_to_play_menu(display_surface):
             display_surface.blit(surf, (HORIZONTAL_MARGIN, VERTICAL_MARGIN * 3 + LEADING / 2 + assets.font_large.get_height() + len(instruction_texts) * 50 + i * 50))
 
         # Update the screen display
-        pygame.display.update()
+        renderer.present()
 
-def pause_menu(display_surface, sounds, frozen_screen, music_elapsed_time):
+def pause_menu(display_surface, sounds, frozen_screen):
     sounds.set_volume(sounds.get_menu_volume())
     sounds.play_pause_music()
 
     def resume_game():
-        sounds.play_game_music(start=music_elapsed_time)
+        sounds.resume_game_music()
         return 'resume'
 
     def return_to_main_menu():
@@ -287,9 +329,12 @@ def pause_menu(display_surface, sounds, frozen_screen, music_elapsed_time):
         Button("Main Menu", assets.font_small, (button_x_start, button_y_start + BUTTON_SPACE * 0.65 * 2), return_to_main_menu),
     ]
 
+    renderer = Renderer(display_surface, on_demand=True)
+    clock = pygame.time.Clock()
+
     # Wait for the user input to restart the game or quit after the player dies
     while True:
-        for event in pygame.event.get():
+        for event in _menu_events(clock, renderer):
             if event.type == pygame.QUIT:
                 pygame.quit()
                 exit()
@@ -307,13 +352,15 @@ def pause_menu(display_surface, sounds, frozen_screen, music_elapsed_time):
                 elif event.key == pygame.K_ESCAPE:
                     return return_to_main_menu()
 
+        if not renderer.needs_redraw:
+            renderer.present()
+            continue
+
         # Draw the frozen screen
         display_surface.blit(frozen_screen, (0, 0))
 
         # Draw semi-transparent overlay
-        overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 125))
-        display_surface.blit(overlay, (0, 0))
+        display_surface.blit(_dim_overlay(), (0, 0))
 
         # Draw the frame for menu and title
         frame.draw(display_surface)
@@ -327,14 +374,14 @@ def pause_menu(display_surface, sounds, frozen_screen, music_elapsed_time):
             button.draw(display_surface)
 
         # Update the screen display
-        pygame.display.update()
+        renderer.present()
 
-def game_over_menu(display_surface, sounds, score, high_score_manager, confetti_sprites):
+def game_over_menu(display_surface, sounds, score, high_score_manager, confetti_sprites, stats=None):
     running = True
     result = False
-    background = Background()
+    background = Background.shared()
     is_new_high_score = score > high_score_manager.get_high_score()
-    high_score_manager.save_high_score(score)
+    high_score_manager.record_run(score, stats) # Queued for the leaderboard's writer thread, never waits on disk
 
     sounds.set_menu_volume(sounds.get_menu_volume())
     sounds.play_game_over_music()
@@ -365,11 +412,19 @@ def game_over_menu(display_surface, sounds, score, high_score_manager, confetti_
         Button("Main Menu", assets.font_small, (button_x_start, button_y_start + BUTTON_SPACE * 0.65), return_to_main_menu),
     ]
 
+    # Create a frame for the new high score
+    new_high_score_frame = Frame(HORIZONTAL_MARGIN * 2 + LEADING * 2, VERTICAL_MARGIN // 2 + LEADING, HORIZONTAL_MARGIN * 5.5 + LEADING * 1.5, VERTICAL_MARGIN * 1.5)
+
+    renderer = Renderer(display_surface, background, on_demand=True)
+    clock = pygame.time.Clock()
+
     # Wait for the user input to restart the game or quit after the player dies
     while running:
-        dt = pygame.time.Clock().tick(FPS) / 1000.0  # Delta time in seconds (for frame rate independent movement)
+        animating = bool(confetti_sprites)
+        events = _menu_events(clock, renderer, animating)
+        dt = clock.get_time() / 1000.0  # Delta time in seconds (for frame rate independent movement)
 
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
                 pygame.quit()
                 exit()
@@ -383,17 +438,21 @@ def game_over_menu(display_surface, sounds, score, high_score_manager, confetti_
                 if event.key == pygame.K_ESCAPE:
                     return_to_main_menu()
 
+        # Only redraw while the confetti plays or after input
+        if animating:
+            renderer.invalidate()
+        if not renderer.needs_redraw:
+            continue
+
         # Draw the background
-        background.draw(display_surface)
+        renderer.draw_background()
 
         # Draw the confetti effect
         confetti_sprites.update(dt)
         confetti_sprites.draw(display_surface)
 
         # Draw semi-transparent overlay
-        overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 125))
-        display_surface.blit(overlay, (0, 0))
+        display_surface.blit(_dim_overlay(), (0, 0))
 
         # Draw the frame for menu and title
         frame.draw(display_surface)
@@ -401,7 +460,6 @@ def game_over_menu(display_surface, sounds, score, high_score_manager, confetti_
 
         if is_new_high_score:
             # Draw the frame for the new high score
-            new_high_score_frame = Frame(HORIZONTAL_MARGIN * 2 + LEADING * 2, VERTICAL_MARGIN // 2 + LEADING, HORIZONTAL_MARGIN * 5.5 + LEADING * 1.5, VERTICAL_MARGIN * 1.5)
             new_high_score_frame.draw(display_surface)
 
             # New High Score text
@@ -419,6 +477,6 @@ def game_over_menu(display_surface, sounds, score, high_score_manager, confetti_
             button.draw(display_surface)
 
         # Update the screen display
-        pygame.display.update()
+        renderer.present()
 
     return result
\ No newline at end of file
@@ -0,0 +1,74 @@
+# ==============================================================================
+# Toggleable overlay showing frame timings, phase costs and sprite counts.
+# ==============================================================================
+
+import pygame
+from datetime import datetime
+from ..settings import FPS, TEXT_COLOR, ACCENT_COLOR, HIGH_SCORE_COLOR, PERF_GRAPH_FRAMES, PERF_DUMP_SECONDS, PERF_DUMP_DIR
+
+class PerfOverlay:
+    def __init__(self, timers, font, pos=(10, 10)):
+        self.timers = timers
+        self.font = font
+        self.visible = False
+        self.pos = pos
+        self.line_height = font.get_linesize()
+        self._lines = {} # line -> (text, color, surface), re-rendered only when the text changes
+
+        # Build the translucent panel once, sized for every line of text plus the graph
+        lines = 2 + len(timers.phases) + len(timers.counters)
+        self.graph_rect = pygame.Rect(pos[0] + 8, pos[1] + 8 + lines * self.line_height, PERF_GRAPH_FRAMES, 60)
+        self.panel = pygame.Surface((self.graph_rect.width + 16, lines * self.line_height + self.graph_rect.height + 16),
+                                    pygame.SRCALPHA)
+        self.panel.fill((0, 0, 0, 170))
+
+    def toggle(self):
+        self.visible = not self.visible
+
+    def dump(self):
+        """Writes the last few seconds of timings to a CSV file and returns its path."""
+        PERF_DUMP_DIR.mkdir(parents=True, exist_ok=True)
+        path = PERF_DUMP_DIR / f"perf_{datetime.now():%Y%m%d_%H%M%S}.csv"
+        frames = self.timers.dump_csv(path, PERF_DUMP_SECONDS)
+        print(f"Wrote {frames} frames of timings to {path}")
+        return path
+
+    def _text(self, surface, text, line, color=TEXT_COLOR):
+        # The values change every frame, so keep them out of the shared text cache
+        cached = self._lines.get(line)
+        if cached is not None and cached[0] == text and cached[1] == color:
+            surf = cached[2]
+        else:
+            surf = self.font.render(text, True, color)
+            self._lines[line] = (text, color, surf)
+        surface.blit(surf, (self.pos[0] + 8, self.pos[1] + 8 + line * self.line_height))
+
+    def draw(self, surface):
+        """Draws the overlay if it is visible and returns the area it covered."""
+        if not self.visible:
+            return None
+        timers = self.timers
+        panel_rect = surface.blit(self.panel, self.pos)
+
+        # Frame time and per-phase costs, averaged over the last second
+        frame_ms = timers.frame.latest()
+        self._text(surface, f"frame {frame_ms:5.2f} ms  avg {timers.frame.mean(FPS):5.2f} ms", 0, HIGH_SCORE_COLOR)
+        self._text(surface, f"fps {1000 / frame_ms if frame_ms else 0:6.1f}", 1)
+        line = 2
+        for phase in timers.phases:
+            self._text(surface, f"{phase:<11}{timers.buffers[phase].mean(FPS):6.3f} ms", line)
+            line += 1
+        for name in timers.counters:
+            self._text(surface, f"{name:<11}{timers.counts[name].latest():6d}", line)
+            line += 1
+
+        # Frame time graph, with the target frame budget as a reference line
+        rect = self.graph_rect
+        scale = rect.height / (3 * 1000 / FPS)
+        budget_y = rect.bottom - 1000 / FPS * scale
+        pygame.draw.line(surface, ACCENT_COLOR, (rect.left, budget_y), (rect.right, budget_y))
+        values = timers.frame.last(rect.width)
+        if len(values) > 1:
+            points = [(rect.left + i, max(rect.top, rect.bottom - v * scale)) for i, v in enumerate(values)]
+            pygame.draw.lines(surface, HIGH_SCORE_COLOR, False, points)
+        return panel_rect
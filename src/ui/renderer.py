@@ -0,0 +1,221 @@
+# ==============================================================================
+# Renderer switching between full-frame and dirty-rectangle presentation, with
+# the world optionally drawn at a lower internal resolution and scaled up.
+# ==============================================================================
+
+import pygame
+from ..settings import DIRTY_RECT_RENDERING, BATCHED_RENDERING, SMOOTH_UPSCALE
+from ..assets import assets
+from .sprite_batch import SpriteBatch, fblits
+from .resolution import ScaledImageCache, DynamicResolution
+
+class Renderer:
+    def __init__(self, display_surface, background=None, dirty=DIRTY_RECT_RENDERING, on_demand=False,
+                 batched=BATCHED_RENDERING, render_scale=1.0, dynamic_resolution=False):
+        self.display_surface = display_surface
+        self.background = background
+        self.dirty = dirty
+        self.on_demand = on_demand # Only redraw after invalidate(), for screens that sit idle
+
+        # Batching needs no per-sprite rects, so it is only used for full frames
+        flags = assets.sprite_blend_flags
+        self.batch = SpriteBatch({"meteors": flags, "lasers": flags, "player": flags, "explosions": flags}) \
+            if batched and not dirty else None
+
+        # Copy of the last full background, used to restore the areas under moved sprites
+        self._background_surf = display_surface.copy() if dirty else None
+        self._full = True # The whole screen has to be drawn and presented on the next frame
+        self._rects = [] # Areas changed this frame
+        self._overlays = [] # Areas drawn over the world last frame, restored before the next one
+        self._last_overlays = []
+
+        # Below full scale the background and world draw to a smaller surface that draw_world scales up under
+        # the HUD, so only scenes that draw a world use it. Dirty mode already limits what is drawn.
+        self.images = ScaledImageCache()
+        self.render_scale = 1.0
+        self._world = None
+        self.set_render_scale(1.0 if dirty else render_scale)
+        self.dynamic = DynamicResolution(render_scale) if dynamic_resolution and not dirty else None
+        if self.dynamic is not None:
+            self.set_render_scale(self.dynamic.scale)
+
+    @property
+    def needs_redraw(self):
+        """Returns True if the whole scene has to be drawn this frame."""
+        if self._full:
+            return True
+        if self.on_demand:
+            return False
+        return not self.dirty or (self.background is not None and self.background.animated)
+
+    def invalidate(self):
+        """Forces the next frame to be drawn and presented in full."""
+        self._full = True
+
+    def set_render_scale(self, scale):
+        """Sets the world's resolution as a fraction of the window's."""
+        if scale == self.render_scale:
+            return
+        self.render_scale = scale
+        self.images.set_scale(scale)
+        if scale == 1.0:
+            self._world = None
+        else:
+            width, height = self.display_surface.get_size()
+            self._world = pygame.Surface((round(width * scale), round(height * scale))).convert(self.display_surface)
+        self.invalidate()
+
+    def adapt(self, work_ms):
+        """Feeds the last frame's drawing and presenting time to the dynamic resolution, which may change
+        the scale. Leave out the update and collisions, which the resolution doesn't change."""
+        if self.dynamic is not None:
+            self.set_render_scale(self.dynamic.update(work_ms))
+
+    @property
+    def target(self):
+        """The surface the background and world are drawn to."""
+        return self.display_surface if self._world is None else self._world
+
+    def _scaled(self, blit_sequence):
+        return blit_sequence if self._world is None else self.images.blit_sequence(blit_sequence)
+
+    def _upscale(self):
+        """Scales the finished world up to fill the window, so the HUD can go on top at full resolution."""
+        if self._world is None:
+            return
+        scale = pygame.transform.smoothscale if SMOOTH_UPSCALE else pygame.transform.scale
+        scale(self._world, self.display_surface.get_size(), self.display_surface)
+
+    def draw_background(self):
+        """Draws the background in full, or only restores last frame's overlays in dirty mode."""
+        if self.needs_redraw:
+            if self._world is not None:
+                fblits(self._world, self.images.blit_sequence(self.background.blit_sequence()))
+                return
+            self.background.draw(self.display_surface)
+            if self.dirty:
+                self._background_surf.blit(self.display_surface, (0, 0))
+            return
+
+        for rect in self._last_overlays:
+            self.restore(rect)
+
+    def restore(self, rect):
+        """Copies the background back over an area of the screen and marks it as changed."""
+        self.display_surface.blit(self._background_surf, rect, rect)
+        self._rects.append(rect)
+
+    def draw_group(self, group):
+        """Draws a sprite group, collecting the rects it touched in dirty mode."""
+        flags = assets.sprite_blend_flags
+        if not self.dirty:
+            group.draw(self.display_surface, special_flags=flags)
+            return
+
+        old_rects = dict(group.spritedict)
+        lost_rects = group.lostsprites
+        group.clear(self.display_surface, self._background_surf)
+        group.draw(self.display_surface, special_flags=flags)
+
+        # Merge each sprite's old and new area when they overlap
+        rects = self._rects
+        rects.extend(lost_rects)
+        for sprite, new_rect in group.spritedict.items():
+            old_rect = old_rects.get(sprite)
+            if old_rect and new_rect.colliderect(old_rect):
+                rects.append(new_rect.union(old_rect))
+            else:
+                rects.append(new_rect)
+                if old_rect:
+                    rects.append(old_rect)
+
+    def clear_batch(self, batch):
+        """Restores the background under a batch drawn last frame, like a MeteorField. Call before draw_group."""
+        if self.dirty and not self.needs_redraw:
+            for rect in batch.drawn_rects:
+                self.restore(rect)
+
+    def draw_batch(self, batch):
+        """Draws an object that renders itself in one call and reports the rects it covered."""
+        rects = batch.draw(self.display_surface, assets.sprite_blend_flags)
+        if self.dirty:
+            self._rects.extend(rects)
+
+    @staticmethod
+    def interpolated(sprites, alpha):
+        """Returns (image, position) pairs placing each sprite alpha of the way from its previous
+        simulation state to its current one."""
+        blit_sequence = []
+        for sprite in sprites:
+            rect = sprite.rect
+            previous = sprite.previous_center
+            if previous is None or alpha >= 1:
+                blit_sequence.append((sprite.image, rect))
+                continue
+            x = previous[0] + (rect.centerx - previous[0]) * alpha
+            y = previous[1] + (rect.centery - previous[1]) * alpha
+            blit_sequence.append((sprite.image, (x - rect.width / 2, y - rect.height / 2)))
+        return blit_sequence
+
+    def draw_world(self, simulation, alpha=1.0):
+        """Draws the simulation's meteors, lasers, player and explosions.
+        Full frames are drawn alpha of the way between the last two ticks, dirty frames at the last tick.
+        Below full scale the world is scaled up to the window afterwards."""
+        field = simulation.meteor_field
+        lag = (1 - alpha) * simulation.dt
+        batch = self.batch
+        scaled = self._scaled
+        if batch is not None:
+            # One fblits call per layer
+            if field is not None:
+                batch.extend("meteors", scaled(field.blit_sequence(lag)))
+            else:
+                batch.extend("meteors", scaled(self.interpolated(simulation.meteor_sprites, alpha)))
+            batch.extend("lasers", scaled(self.interpolated(simulation.laser_sprites, alpha)))
+            if simulation.player.alive():
+                batch.extend("player", scaled(self.interpolated((simulation.player,), alpha)))
+            batch.extend("explosions", scaled([(sprite.image, sprite.rect) for sprite in simulation.explosion_sprites]))
+            batch.flush(self.target)
+            self._upscale()
+            return
+
+        if not self.dirty:
+            fblits(self.target, scaled(self.interpolated(simulation.all_sprites, alpha)), assets.sprite_blend_flags)
+            if field is not None:
+                fblits(self.target, scaled(field.blit_sequence(lag)), assets.sprite_blend_flags)
+            self._upscale()
+            return
+
+        if field is not None:
+            self.clear_batch(field)
+        self.draw_group(simulation.all_sprites)
+        if field is not None:
+            self.draw_batch(field)
+
+    def blit_hud(self, surf, pos):
+        """Draws a HUD element on top of the world and returns the area it covers."""
+        rect = surf.get_rect(topleft=pos)
+        if self.batch is not None:
+            self.batch.add("hud", surf, rect.topleft)
+            self.batch.flush(self.display_surface)
+        else:
+            self.display_surface.blit(surf, rect)
+            self.add_overlay(rect)
+        return rect
+
+    def add_overlay(self, rect):
+        """Marks an area drawn on top of the world, like the HUD, to be restored next frame."""
+        if self.dirty and rect:
+            self._overlays.append(rect)
+            self._rects.append(rect)
+
+    def present(self):
+        """Updates the whole window or only the areas that changed."""
+        if self.needs_redraw:
+            pygame.display.update()
+        elif self._rects:
+            pygame.display.update(self._rects)
+
+        self._full = False
+        self._rects = []
+        self._last_overlays, self._overlays = self._overlays, []
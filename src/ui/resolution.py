@@ -0,0 +1,76 @@
+# ==============================================================================
+# Internal render resolution: sprite images cached at the world's scale, and a
+# controller that steps the scale to keep the frame work inside a budget.
+# ==============================================================================
+
+import weakref
+import pygame
+from ..settings import RENDER_SCALES, RENDER_BUDGET_MS, RENDER_UPSCALE_HEADROOM, RESOLUTION_SETTLE_FRAMES
+
+class ScaledImageCache:
+    def __init__(self, scale=1.0):
+        self.scale = scale
+        # original surface -> surface scaled by self.scale. Weak keys, so an image evicted from the rotation
+        # atlas or released by its sprite takes its scaled copy with it.
+        self._images = weakref.WeakKeyDictionary()
+
+    def set_scale(self, scale):
+        """Changes the scale, dropping the images scaled for the old one."""
+        if scale != self.scale:
+            self.scale = scale
+            self._images.clear()
+
+    def get(self, surf):
+        """Returns the surface scaled once and cached for as long as the original is alive."""
+        scaled = self._images.get(surf)
+        if scaled is None:
+            w, h = surf.get_size()
+            size = (max(1, round(w * self.scale)), max(1, round(h * self.scale)))
+            scaled = pygame.transform.smoothscale(surf, size) if surf.get_bitsize() >= 24 else pygame.transform.scale(surf, size)
+            self._images[surf] = scaled
+        return scaled
+
+    def blit_sequence(self, blit_sequence):
+        """Maps (image, position) pairs in window coordinates to the scaled images and positions."""
+        scale = self.scale
+        get = self.get
+        return [(get(image), (pos[0] * scale, pos[1] * scale)) for image, pos in blit_sequence]
+
+class DynamicResolution:
+    def __init__(self, scale=1.0, scales=RENDER_SCALES, budget_ms=RENDER_BUDGET_MS,
+                 headroom=RENDER_UPSCALE_HEADROOM, settle_frames=RESOLUTION_SETTLE_FRAMES):
+        self.scales = sorted(scales, reverse=True)
+        self.index = min(range(len(self.scales)), key=lambda i: abs(self.scales[i] - scale))
+        self.budget_ms = budget_ms
+        self.headroom = headroom
+        self.settle_frames = settle_frames
+        self.average = None # Smoothed frame work in ms
+        self._smoothing = 2 / (settle_frames + 1)
+        self._cooldown = settle_frames
+
+    @property
+    def scale(self):
+        return self.scales[self.index]
+
+    def update(self, work_ms):
+        """Feeds one frame's render time and returns the scale to render the next frame at.
+        Drops a step when the average is over budget, rises one when it is well under."""
+        if self.average is None:
+            self.average = work_ms
+        else:
+            self.average += (work_ms - self.average) * self._smoothing
+        if self._cooldown:
+            self._cooldown -= 1
+            return self.scale
+
+        step = 0
+        if self.average > self.budget_ms and self.index < len(self.scales) - 1:
+            step = 1
+        elif self.average < self.budget_ms * self.headroom and self.index > 0:
+            step = -1
+        if step:
+            # Start measuring afresh at the new resolution
+            self.index += step
+            self.average = None
+            self._cooldown = self.settle_frames
+        return self.scale
@@ -0,0 +1,44 @@
+# ==============================================================================
+# Loading screen shown while assets and sounds are decoded in the background.
+# ==============================================================================
+
+import pygame
+from time import perf_counter
+from ..settings import WINDOW_WIDTH, WINDOW_HEIGHT, MENU_FPS, BG_COLOR, TITLE_COLOR, TEXT_COLOR, CAPTION
+from ..assets import assets
+from .text_cache import text_cache
+
+BAR_WIDTH = WINDOW_WIDTH // 2
+BAR_HEIGHT = 16
+
+def loading_screen(display_surface, futures):
+    """Draws a progress bar until every future is done.
+    Returns the perf_counter time at which the first frame was shown."""
+    clock = pygame.time.Clock()
+    first_frame = None
+    bar_rect = pygame.Rect(0, 0, BAR_WIDTH, BAR_HEIGHT)
+    bar_rect.center = (WINDOW_WIDTH // 2, WINDOW_HEIGHT * 3 // 5)
+
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                exit()
+
+        done = sum(future.done() for future in futures)
+        display_surface.fill(BG_COLOR)
+        title_surf = text_cache.render(assets.font_large, CAPTION, TITLE_COLOR)
+        display_surface.blit(title_surf, title_surf.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT * 2 // 5)))
+
+        # Outline, then the finished share of the bar
+        fill_rect = bar_rect.copy()
+        fill_rect.width = int(BAR_WIDTH * done / max(len(futures), 1))
+        pygame.draw.rect(display_surface, TEXT_COLOR, fill_rect, border_radius=BAR_HEIGHT // 2)
+        pygame.draw.rect(display_surface, TEXT_COLOR, bar_rect, 2, border_radius=BAR_HEIGHT // 2)
+        pygame.display.flip()
+
+        if first_frame is None:
+            first_frame = perf_counter()
+        if done == len(futures):
+            return first_frame
+        clock.tick(MENU_FPS)
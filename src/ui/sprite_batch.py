@@ -0,0 +1,36 @@
+# ==============================================================================
+# SpriteBatch, which collects blits per layer and submits each layer in one call.
+# ==============================================================================
+
+# Draw order of the layers, back to front
+LAYERS = ("background", "meteors", "lasers", "player", "explosions", "hud")
+
+def fblits(surface, blit_sequence, special_flags=0):
+    """Blits a sequence of (surface, position) pairs in one call, without returning rects."""
+    if hasattr(surface, "fblits"):
+        surface.fblits(blit_sequence, special_flags)
+    else:
+        surface.blits(((surf, pos, None, special_flags) for surf, pos in blit_sequence), doreturn=False)
+
+class SpriteBatch:
+    def __init__(self, layer_flags=None):
+        self.layers = {name: [] for name in LAYERS}
+        self.layer_flags = layer_flags or {} # Blend flags per layer, e.g. BLEND_PREMULTIPLIED
+
+    def add(self, layer, surf, pos):
+        self.layers[layer].append((surf, pos))
+
+    def add_sprites(self, layer, sprites):
+        """Queues every sprite in a group or sequence."""
+        self.layers[layer].extend((sprite.image, sprite.rect) for sprite in sprites)
+
+    def extend(self, layer, blit_sequence):
+        self.layers[layer].extend(blit_sequence)
+
+    def flush(self, surface):
+        """Draws every queued layer in order, one blit call per layer."""
+        for name in LAYERS:
+            queued = self.layers[name]
+            if queued:
+                fblits(surface, queued, self.layer_flags.get(name, 0))
+                queued.clear()
@@ -0,0 +1,67 @@
+# ==============================================================================
+# A shared cache of rendered text surfaces with least-recently-used eviction.
+# ==============================================================================
+
+import pygame
+from collections import OrderedDict
+from ..settings import TEXT_CACHE_SIZE
+
+class TextCache:
+    def __init__(self, max_entries=TEXT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._digits = {} # Digit glyphs per (font, color, antialias), used to build numbers without the font
+
+        # Cache stats
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, key):
+        surf = self._entries.get(key)
+        if surf is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return surf
+
+    def _store(self, key, surf):
+        self.misses += 1
+        self._entries[key] = surf
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return surf
+
+    def render(self, font, text, color, antialias=True):
+        """Returns the rendered text, only asking the font when it isn't cached yet."""
+        key = (font, text, color, antialias)
+        surf = self._lookup(key)
+        if surf is None:
+            surf = self._store(key, font.render(text, antialias, color))
+        return surf
+
+    def render_number(self, font, value, color, antialias=True):
+        """Returns a rendered integer, composed from cached digit glyphs on a miss."""
+        text = str(value)
+        key = (font, text, color, antialias)
+        surf = self._lookup(key)
+        if surf is not None:
+            return surf
+
+        glyphs = self._digits.get((font, color, antialias))
+        if glyphs is None:
+            glyphs = {c: font.render(c, antialias, color) for c in "0123456789-"}
+            self._digits[(font, color, antialias)] = glyphs
+
+        # Blit the glyphs side by side onto one transparent surface
+        width = sum(glyphs[c].get_width() for c in text)
+        surf = pygame.Surface((width, glyphs["0"].get_height()), pygame.SRCALPHA)
+        x = 0
+        for c in text:
+            surf.blit(glyphs[c], (x, 0))
+            x += glyphs[c].get_width()
+        return self._store(key, surf)
+
+    def __len__(self):
+        return len(self._entries)
+
+# Create a global instance of TextCache
+text_cache = TextCache()
@@ -0,0 +1,43 @@
+import pygame
+from src.sprites.laser import Laser
+from src.sprites.pool import SpritePool
+
+def _laser_pool(max_idle=4):
+    group = pygame.sprite.Group()
+    surf = pygame.Surface((4, 16), pygame.SRCALPHA)
+    surf.fill((255, 255, 255, 255))
+    pool = SpritePool(lambda groups, pos: Laser(surf, pos, groups), (group,), max_idle)
+    return pool, group
+
+def test_released_sprite_is_reused_with_reset_state():
+    pool, group = _laser_pool()
+    laser = pool.acquire((100, 200))
+    laser.previous_center = laser.rect.center
+    laser.update(0.1)
+    laser.release()
+    assert laser not in group
+
+    reused = pool.acquire((300, 400))
+    assert reused is laser
+    assert reused in group
+    assert reused.rect.midbottom == (300, 400)
+    assert reused.previous_center is None
+    assert pool.stats() == {"hits": 1, "misses": 1, "dropped": 0, "free": 0}
+
+def test_release_twice_keeps_one_idle_copy():
+    pool, _ = _laser_pool()
+    laser = pool.acquire((0, 0))
+    laser.release()
+    laser.release()
+    assert pool.stats()["free"] == 1
+    assert pool.acquire((0, 0)) is laser
+    assert pool.acquire((0, 0)) is not laser
+
+def test_max_idle_caps_the_free_list_not_live_sprites():
+    pool, group = _laser_pool(max_idle=2)
+    lasers = [pool.acquire((i, 0)) for i in range(5)]
+    assert len(group) == 5
+    for laser in lasers:
+        laser.release()
+    assert pool.stats()["free"] == 2
+    assert pool.stats()["dropped"] == 3
@@ -0,0 +1,31 @@
+from src.quality import QualityGovernor
+
+def test_slow_first_frames_do_not_drop_a_tier():
+    governor = QualityGovernor(budget_ms=20, recover_ms=17, smoothing_frames=30, degrade_frames=30,
+                               recover_frames=180, warmup_frames=10)
+    # The first frame covers the setup before the round, the next ones run on cold caches
+    for frame_ms in (242, 32, 17, 74, 60, 45, 40, 35, 30, 30):
+        assert not governor.update(frame_ms)
+    for _ in range(120):
+        governor.update(14)
+    assert governor.tier == 0
+
+def test_warmup_restarts_after_reset_average():
+    governor = QualityGovernor(budget_ms=20, recover_ms=17, smoothing_frames=30, degrade_frames=30,
+                               recover_frames=180, warmup_frames=10)
+    for _ in range(40):
+        governor.update(14)
+    governor.reset_average()
+    for _ in range(10):
+        governor.update(250)
+    assert governor.average is None
+    for _ in range(120):
+        governor.update(14)
+    assert governor.tier == 0
+
+def test_sustained_slow_frames_still_drop_a_tier():
+    governor = QualityGovernor(budget_ms=20, recover_ms=17, smoothing_frames=30, degrade_frames=30,
+                               recover_frames=180, warmup_frames=10)
+    changed = [governor.update(40) for _ in range(60)]
+    assert any(changed)
+    assert governor.tier == 1